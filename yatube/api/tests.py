@@ -0,0 +1,212 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+INDEX_URL = reverse('api:index')
+FOLLOW_URL = reverse('api:follow_index')
+
+
+@override_settings(POSTS_PER_PAGE=2)
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ApiAuthor')
+        cls.reader = User.objects.create_user(username='ApiReader')
+        cls.group = Group.objects.create(
+            title='Группа API',
+            slug='api-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.urls = (
+            INDEX_URL,
+            reverse('api:group_posts', kwargs={'slug': cls.group.slug}),
+            reverse(
+                'api:profile', kwargs={'username': cls.author.username}
+            ),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_feeds_paginate_by_cursor(self):
+        """Ленты отдаются страницами по курсору, новые посты первыми."""
+        expected = [post.text for post in reversed(self.posts)]
+        for url in self.urls:
+            with self.subTest(url=url):
+                data = self.guest_client.get(url).json()
+                texts = [post['text'] for post in data['results']]
+                data = self.guest_client.get(
+                    url, {'after': data['next']}
+                ).json()
+                texts += [post['text'] for post in data['results']]
+                self.assertEqual(texts, expected)
+                self.assertIsNone(data['next'])
+
+    def test_post_fields(self):
+        """Пост сериализуется плоским словарём."""
+        post = self.posts[0]
+        data = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.pk})
+        ).json()
+        self.assertEqual(data['author'], self.author.username)
+        self.assertEqual(data['group'], self.group.slug)
+        self.assertEqual(data['comments_count'], 1)
+        self.assertIsNone(data['image'])
+
+    def test_not_modified(self):
+        """Повторный запрос с ETag получает 304 без чтения ленты."""
+        response = self.guest_client.get(INDEX_URL)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                INDEX_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.guest_client.get(INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_keeps_feed_etag_valid(self):
+        """Новый комментарий не меняет ленту, и её ETag остаётся верным."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                Comment.objects.create(
+                    post=self.posts[-1], author=self.reader, text='Ещё'
+                )
+                revalidated = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(revalidated.status_code, 304)
+                fresh = self.guest_client.get(url)
+                self.assertEqual(fresh['ETag'], response['ETag'])
+                self.assertEqual(fresh.content, response.content)
+
+    def test_replaced_comment_changes_post_etags(self):
+        """Замена комментария при том же их числе меняет ETag поста."""
+        post = self.posts[0]
+        urls = (
+            reverse('api:post_detail', kwargs={'post_id': post.pk}),
+            reverse('api:post_comments', kwargs={'post_id': post.pk}),
+        )
+        responses = {url: self.guest_client.get(url) for url in urls}
+        Comment.objects.filter(post=post).delete()
+        Comment.objects.create(
+            post=post, author=self.reader, text='Новый комментарий'
+        )
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 200)
+        texts = [
+            row['text']
+            for row in self.guest_client.get(urls[1]).json()['results']
+        ]
+        self.assertEqual(texts, ['Новый комментарий'])
+
+    def test_rename_changes_feed_etags(self):
+        """Новое имя автора меняет ETag всех лент с его постами."""
+        urls = (*self.urls[:2], FOLLOW_URL)
+        responses = {
+            url: self.authorized_client.get(url) for url in urls
+        }
+        self.author.username = 'RenamedAuthor'
+        self.author.save()
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json()['results'][0]['author'],
+                    'RenamedAuthor',
+                )
+
+    def test_no_last_modified(self):
+        """Без Last-Modified правка поста не прячется за If-Modified-Since."""
+        response = self.guest_client.get(INDEX_URL)
+        self.assertNotIn('Last-Modified', response)
+        post = self.posts[-1]
+        post.text = 'Исправленный пост'
+        post.save()
+        response = self.guest_client.get(
+            INDEX_URL, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'Исправленный пост',
+            [row['text'] for row in response.json()['results']],
+        )
+
+    def test_follow_feed(self):
+        """Лента подписок требует входа и меняет ETag при отписке."""
+        self.assertEqual(self.guest_client.get(FOLLOW_URL).status_code, 401)
+        response = self.authorized_client.get(FOLLOW_URL)
+        self.assertEqual(len(response.json()['results']), 2)
+        etag = response['ETag']
+        Follow.objects.filter(user=self.reader).delete()
+        response = self.authorized_client.get(
+            FOLLOW_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.json()['results'], [])
+
+    def test_comments(self):
+        """Комментарии поста и 304 до нового комментария."""
+        url = reverse(
+            'api:post_comments', kwargs={'post_id': self.posts[0].pk}
+        )
+        response = self.guest_client.get(url)
+        self.assertEqual(
+            [comment['text'] for comment in response.json()['results']],
+            ['Комментарий'],
+        )
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_search(self):
+        """Поиск отдаёт посты по курсору, лучшие совпадения первыми."""
+        url = reverse('api:search')
+        data = self.guest_client.get(url, {'q': 'посты'}).json()
+        self.assertEqual(len(data['results']), 2)
+        rest = self.guest_client.get(
+            url, {'q': 'посты', 'after': data['next']}
+        ).json()
+        self.assertEqual(len(rest['results']), 1)
+        self.assertIsNone(rest['next'])
+        found = {post['id'] for post in data['results'] + rest['results']}
+        self.assertEqual(found, {post.pk for post in self.posts})
+
+    def test_missing_objects(self):
+        """Несуществующие группа, автор и пост — 404."""
+        urls = (
+            reverse('api:group_posts', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+            reverse('api:post_detail', kwargs={'post_id': 0}),
+            reverse('api:post_comments', kwargs={'post_id': 0}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(url).status_code, 404
+                )
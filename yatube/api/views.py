@@ -0,0 +1,197 @@
+"""JSON API для чтения лент, постов и комментариев.
+
+Строки читаются через values(), без создания моделей, и отдаются
+страницами по курсору (?after=, ?before=), как и HTML-ленты. ETag
+строится из поколений кэша лент и страницы поста (posts.cache) вместе с
+CARDS, который сбрасывают переименования авторов, так что повторный
+запрос без изменений получает 304, не читая ленту.
+Last-Modified не отдаётся: дата последней записи не меняется при правке
+и удалении постов, и запрос только с If-Modified-Since получил бы 304
+со старыми данными.
+"""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
+
+from posts.cache import (ALL, CARDS, author_scope, follow_scope,
+                         get_generation, group_scope, post_scope)
+from posts.models import Comment, Group, Post, User
+from posts.paginator import CursorPaginator
+from posts.search import SearchPaginator, search_posts
+from posts.timeline import FEED_KEYS, follow_feed
+from posts.utils import COMMENT_KEYS
+
+# Число комментариев отдаётся только у поста: комментарии не меняют
+# поколений лент, и с ним ETag ленты пропускал бы новые комментарии.
+POST_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'image',
+    'author__username',
+    'group__slug',
+)
+COMMENT_FIELDS = ('id', 'text', 'created', 'author__username')
+
+
+def serialize_post(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': row['author__username'],
+        'group': row['group__slug'],
+        'image': default_storage.url(row['image']) if row['image'] else None,
+    }
+
+
+def serialize_post_detail(row):
+    return {
+        **serialize_post(row),
+        'comments_count': row['comments_count'],
+    }
+
+
+def serialize_comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': row['author__username'],
+    }
+
+
+def cursor_response(request, rows, serialize, keys=('pub_date', 'id'),
+                    per_page=None):
+    """Страница строк по курсору вместе с курсорами соседних страниц."""
+    paginator = CursorPaginator(
+        rows, per_page or settings.POSTS_PER_PAGE, keys
+    )
+    return page_response(request, paginator, serialize)
+
+
+def page_response(request, paginator, serialize):
+    page = paginator.get_cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return JsonResponse({
+        'results': [serialize(row) for row in page],
+        'next': page.cursor.next_cursor,
+        'previous': page.cursor.previous_cursor,
+    })
+
+
+def group_id(slug):
+    return get_object_or_404(Group.objects.only('id'), slug=slug).pk
+
+
+def author_id(username):
+    return get_object_or_404(User.objects.only('id'), username=username).pk
+
+
+def feed_etag(*scopes):
+    # Строки лент выводят имена авторов, а их смена сбрасывает CARDS.
+    return get_generation(CARDS, *scopes)
+
+
+def index_etag(request):
+    return feed_etag(ALL)
+
+
+@condition(etag_func=index_etag)
+def index(request):
+    return cursor_response(
+        request, Post.objects.values(*POST_FIELDS), serialize_post
+    )
+
+
+def group_etag(request, slug):
+    return feed_etag(group_scope(group_id(slug)))
+
+
+@condition(etag_func=group_etag)
+def group_posts(request, slug):
+    post_list = Post.objects.filter(group=group_id(slug))
+    return cursor_response(
+        request, post_list.values(*POST_FIELDS), serialize_post
+    )
+
+
+def profile_etag(request, username):
+    return feed_etag(author_scope(author_id(username)))
+
+
+@condition(etag_func=profile_etag)
+def profile(request, username):
+    post_list = Post.objects.filter(author=author_id(username))
+    return cursor_response(
+        request, post_list.values(*POST_FIELDS), serialize_post
+    )
+
+
+def follow_etag(request):
+    # Лента своя у каждого пользователя, поэтому он входит в ETag.
+    if not request.user.is_authenticated:
+        return None
+    user_id = request.user.pk
+    return f'{user_id}.{feed_etag(ALL, follow_scope(user_id))}'
+
+
+@condition(etag_func=follow_etag)
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Нужно войти в аккаунт'}, status=401
+        )
+    post_list = follow_feed(request.user)
+    return cursor_response(
+        request,
+        post_list.values(*POST_FIELDS, *FEED_KEYS),
+        serialize_post,
+        FEED_KEYS,
+    )
+
+
+def post_etag(request, post_id):
+    # Правку поста и любые изменения комментариев сбрасывает post_scope.
+    if not Post.objects.filter(pk=post_id).exists():
+        return None
+    return feed_etag(post_scope(post_id))
+
+
+@condition(etag_func=post_etag)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.values(*POST_FIELDS, 'comments_count'), pk=post_id
+    )
+    return JsonResponse(serialize_post_detail(post))
+
+
+def comments_etag(request, post_id):
+    etag = post_etag(request, post_id)
+    return etag and f'c{etag}'
+
+
+@condition(etag_func=comments_etag)
+def post_comments(request, post_id):
+    get_object_or_404(Post.objects.only('id'), pk=post_id)
+    comments = Comment.objects.filter(post=post_id).values(*COMMENT_FIELDS)
+    return cursor_response(
+        request,
+        comments,
+        serialize_comment,
+        COMMENT_KEYS,
+        settings.COMMENTS_PER_PAGE,
+    )
+
+
+def search(request):
+    """Посты по запросу ?q=, самые подходящие первыми."""
+    posts = search_posts(request.GET.get('q', '').strip())
+    paginator = SearchPaginator(
+        posts.values(*POST_FIELDS, 'score'), settings.POSTS_PER_PAGE
+    )
+    return page_response(request, paginator, serialize_post)
@@ -0,0 +1,124 @@
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+MISSING = object()
+
+
+class TwoTierCache(BaseCache):
+    """Общий кэш с маленьким LRU-кэшем процесса перед ним.
+
+    Самые горячие ключи читаются из памяти процесса без обращения к
+    общему кэшу. Локальная копия живёт не дольше LOCAL_TIMEOUT секунд:
+    на это время другие процессы могут видеть старое значение. Ключи с
+    префиксами из LOCAL_EXCLUDE_PREFIXES (счётчики, которые должны быть
+    одинаковыми во всех процессах) читаются только из общего кэша.
+
+    OPTIONS:
+        SHARED_ALIAS — алиас общего кэша в CACHES;
+        LOCAL_TIMEOUT — время жизни локальной копии, секунды;
+        LOCAL_MAX_ENTRIES — размер локального кэша;
+        LOCAL_EXCLUDE_PREFIXES — префиксы ключей мимо локального кэша.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_ALIAS', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.exclude_prefixes = tuple(
+            options.get('LOCAL_EXCLUDE_PREFIXES', ())
+        )
+        self.local = LocMemCache(f'two-tier-{location}', {
+            'TIMEOUT': self.local_timeout,
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+            },
+        })
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def is_local(self, key):
+        return not key.startswith(self.exclude_prefixes)
+
+    def local_timeout_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added and self.is_local(key):
+            self.local.set(
+                key, value, self.local_timeout_for(timeout), version
+            )
+        return added
+
+    def get(self, key, default=None, version=None):
+        if self.is_local(key):
+            value = self.local.get(key, MISSING, version)
+            if value is not MISSING:
+                return value
+        value = self.shared.get(key, MISSING, version)
+        if value is MISSING:
+            return default
+        if self.is_local(key):
+            self.local.set(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        local_keys = [key for key in keys if self.is_local(key)]
+        found = self.local.get_many(local_keys, version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version)
+            found.update(shared)
+            self.local.set_many({
+                key: value for key, value in shared.items()
+                if self.is_local(key)
+            }, version=version)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        if self.is_local(key):
+            self.local.set(
+                key, value, self.local_timeout_for(timeout), version
+            )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        self.local.set_many({
+            key: value for key, value in data.items()
+            if self.is_local(key) and key not in (failed or ())
+        }, self.local_timeout_for(timeout), version)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(key, version)
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version)
+        self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version)
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, MISSING, version) is not MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self.local.delete(key, version)
+        return self.shared.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        self.local.delete(key, version)
+        return self.shared.decr(key, delta, version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
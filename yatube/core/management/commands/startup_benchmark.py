@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROFILES = ('development', 'production')
+TEMPLATE = 'posts/index.html'
+TEMPLATE_LOADS = 100
+
+# Выполняется в отдельном процессе: импорт проекта, загрузка URLconf и
+# первого шаблона, затем повторные загрузки шаблона.
+PROBE = f'''
+import json, resource, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.template.loader import get_template
+from django.urls import get_resolver
+get_resolver().url_patterns
+get_template({TEMPLATE!r})
+startup = time.perf_counter() - start
+start = time.perf_counter()
+for _ in range({TEMPLATE_LOADS}):
+    get_template({TEMPLATE!r})
+print(json.dumps({{
+    'startup': startup,
+    'templates': time.perf_counter() - start,
+    'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+'''
+
+
+def probe(profile):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'yatube.settings',
+        'SETTINGS_PROFILE': profile,
+    }
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=settings.BASE_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время запуска проекта в профилях настроек'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз запускать каждый профиль',
+        )
+        parser.add_argument(
+            '--profile', action='append', choices=PROFILES,
+            help='Профиль для сравнения, по умолчанию все',
+        )
+
+    def handle(self, *args, **options):
+        for profile in options['profile'] or PROFILES:
+            runs = [probe(profile) for _ in range(options['repeat'])]
+            startup = statistics.median(run['startup'] for run in runs)
+            templates = statistics.median(run['templates'] for run in runs)
+            max_rss = max(run['max_rss'] for run in runs)
+            self.stdout.write(
+                f'{profile}: запуск {startup * 1000:.1f} мс, '
+                f'{TEMPLATE_LOADS} загрузок шаблона '
+                f'{templates * 1000:.1f} мс, память {max_rss // 1024} МБ'
+            )
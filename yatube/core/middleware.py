@@ -0,0 +1,43 @@
+import random
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .routers import stop_replica_reads, use_replica, wrote
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ReplicaMiddleware:
+    """Отправляет чтения безопасных запросов на реплику.
+
+    После запроса, который что-то записал, ставит куку PIN_COOKIE на
+    REPLICA_PIN_SECONDS секунд: пока она есть, пользователь читает из
+    default и видит свои записи, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        ):
+            use_replica(random.choice(settings.REPLICA_DATABASES))
+        else:
+            use_replica(None)
+        try:
+            response = self.get_response(request)
+            if wrote():
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                )
+            return response
+        finally:
+            stop_replica_reads()
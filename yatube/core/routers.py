@@ -0,0 +1,69 @@
+"""Чтение с реплик базы.
+
+Реплики — алиасы из REPLICA_DATABASES. ReplicaMiddleware выбирает
+реплику для безопасного запроса (GET, HEAD), и все чтения этого
+запроса идут на неё. Запись всегда идёт в default, и после первой
+записи запрос читает из default, чтобы видеть то, что записал.
+
+Реплика отстаёт, а поколения кэша лент (posts.cache) меняются сразу.
+Запрос, который прочитал с реплики старые строки, не должен класть их
+в кэш под новым поколением: там они пролежат часами. Поэтому поколение,
+изменённое меньше REPLICA_PIN_SECONDS назад, переводит запрос на
+default (read_primary), а если запрос уже читал с реплики, его
+результат не кэшируется (cacheable).
+"""
+import threading
+
+_state = threading.local()
+
+
+def use_replica(alias):
+    """Направляет чтения текущего потока на реплику (None — в default)."""
+    _state.replica = alias
+    _state.wrote = False
+    _state.read_replica = False
+    _state.stale = False
+
+
+def stop_replica_reads():
+    """Конец запроса: чтения потока снова идут в default.
+
+    Признак cacheable() сохраняется для middleware, стоящих выше.
+    """
+    _state.replica = None
+
+
+def wrote():
+    return getattr(_state, 'wrote', False)
+
+
+def read_primary():
+    """Переводит дальнейшие чтения запроса на default."""
+    if getattr(_state, 'read_replica', False):
+        _state.stale = True
+    _state.replica = None
+
+
+def cacheable():
+    """Можно ли кэшировать то, что прочитал запрос."""
+    return not getattr(_state, 'stale', False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if replica is not None:
+            _state.read_replica = True
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # Реплика может ещё не получить эту запись.
+        _state.replica = None
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
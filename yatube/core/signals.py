@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Включает WAL и остальные PRAGMA из SQLITE_PRAGMAS.
+
+    В режиме WAL читатели не ждут, пока пишущий закончит транзакцию, а
+    busy_timeout заставляет пишущих ждать друг друга вместо ошибки
+    «database is locked».
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -1,4 +1,26 @@
-from django.test import TestCase, Client
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import (Client, SimpleTestCase, TestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.cache import ALL, bump_generation, post_scope
+from posts.middleware import page_key
+from posts.models import Post, User
+
+from .cache import TwoTierCache
+from .middleware import PIN_COOKIE
+from .routers import ReplicaRouter, cacheable, read_primary, use_replica
+
+REPLICA = 'replica1'
 
 
 class ViewTestClass(TestCase):
@@ -19,3 +41,242 @@ class ViewTestClass(TestCase):
             with self.subTest(address=address):
                 response = self.guest_client.get(address)
                 self.assertTemplateUsed(response, template)
+
+
+class TwoTierCacheTests(TestCase):
+    """Двухуровневый кэш над общим файловым кэшем.
+
+    Два экземпляра TwoTierCache с разными локальными кэшами изображают
+    два процесса, файловый кэш — общий кэш вроде Redis.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'shared': {
+                'BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'
+                ),
+                'LOCATION': self.directory,
+            },
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        params = {
+            'OPTIONS': {
+                'SHARED_ALIAS': 'shared',
+                'LOCAL_TIMEOUT': 60,
+                'LOCAL_EXCLUDE_PREFIXES': ('counter:',),
+            },
+        }
+        self.first = TwoTierCache('first', params)
+        self.second = TwoTierCache('second', params)
+        self.addCleanup(self.first.clear)
+        self.addCleanup(self.second.local.clear)
+
+    def test_values_are_shared(self):
+        """Значение, записанное одним процессом, видно другому."""
+        self.first.set('key', 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(
+            self.second.get_many(['key', 'other']), {'key': 'value'}
+        )
+
+    def test_hot_key_served_locally(self):
+        """Повторное чтение не обращается к общему кэшу."""
+        self.first.set('key', 'value')
+        self.second.get('key')
+        with mock.patch.object(
+            type(caches['shared']), 'get', side_effect=AssertionError
+        ):
+            self.assertEqual(self.second.get('key'), 'value')
+
+    def test_excluded_prefix_is_always_fresh(self):
+        """Счётчики читаются из общего кэша и не устаревают локально."""
+        self.first.add('counter:feed', 1)
+        self.assertEqual(self.second.get('counter:feed'), 1)
+        self.first.incr('counter:feed')
+        self.assertEqual(self.second.get('counter:feed'), 2)
+        self.assertEqual(self.second.get_many(['counter:feed']), {
+            'counter:feed': 2
+        })
+
+    def test_delete_clears_both_tiers(self):
+        """Удаление убирает ключ и из локального, и из общего кэша."""
+        self.first.set('key', 'value')
+        self.first.delete('key')
+        self.assertIsNone(self.first.get('key'))
+        self.assertIsNone(self.second.get('key'))
+
+
+class StartupBenchmarkTests(TestCase):
+    def test_profiles_compared(self):
+        """Бенчмарк запускает проект в каждом профиле настроек."""
+        out = StringIO()
+        call_command('startup_benchmark', repeat=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('development: запуск'))
+        self.assertTrue(lines[1].startswith('production: запуск'))
+
+
+class SqliteTuningTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def pragmas(self):
+        """PRAGMA нового соединения с файлом SQLite."""
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': f'{self.directory}/tuning.sqlite3',
+        })
+        try:
+            with wrapper.cursor() as cursor:
+                return {
+                    name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                    for name in ('journal_mode', 'synchronous',
+                                 'busy_timeout')
+                }
+        finally:
+            wrapper.close()
+
+    @override_settings(SQLITE_TUNING=True)
+    def test_tuning_enabled(self):
+        """С SQLITE_TUNING соединение переходит в WAL."""
+        self.assertEqual(self.pragmas(), {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+        })
+
+    @override_settings(SQLITE_TUNING=False)
+    def test_tuning_disabled(self):
+        """Без SQLITE_TUNING остаётся журнал отката."""
+        self.assertEqual(self.pragmas()['journal_mode'], 'delete')
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaRoutingTests(TestCase):
+    """Основная база и реплика — два разных файла SQLite."""
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        path = f'{cls.directory}/replica.sqlite3'
+        # Реплика догнала основную базу: у неё та же схема.
+        connection.ensure_connection()
+        replica = sqlite3.connect(path)
+        connection.connection.backup(replica)
+        replica.close()
+        connections.databases[REPLICA] = {
+            **connection.settings_dict, 'NAME': path, 'TEST': {},
+        }
+        connections.ensure_defaults(REPLICA)
+        connections.prepare_test_settings(REPLICA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='ReplicaAuthor')
+        User.objects.using(REPLICA).bulk_create(
+            [User(pk=cls.author.pk, username=cls.author.username)]
+        )
+        Post.objects.create(author=cls.author, text='Пост в основной базе')
+        Post.objects.using(REPLICA).bulk_create(
+            [Post(author=cls.author, text='Пост на реплике')]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_safe_reads_use_replica(self):
+        """Гость читает ленту с реплики."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост на реплике')
+        self.assertNotContains(response, 'Пост в основной базе')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_pins_reads_to_primary(self):
+        """После записи пользователь читает свои посты из default."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Только что написан'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.authorized_client.get(
+            reverse('posts:profile', kwargs={'username': self.author})
+        )
+        self.assertContains(response, 'Только что написан')
+        self.assertContains(response, 'Пост в основной базе')
+
+    def test_failed_write_not_pinned(self):
+        """Запрос, который ничего не записал, не закрепляет default."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), {'text': ''}
+        )
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_switches_request_to_primary(self):
+        """Первая запись переводит чтения запроса на default."""
+        router = ReplicaRouter()
+        use_replica(REPLICA)
+        self.addCleanup(use_replica, None)
+        self.assertEqual(router.db_for_read(Post), REPLICA)
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertIsNone(router.db_for_read(Post))
+
+    def test_fresh_generation_reads_primary(self):
+        """Недавно изменённая лента читается и кэшируется из default."""
+        bump_generation(ALL)
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        self.assertContains(response, 'Пост в основной базе')
+        # Страница из кэша — тоже с данными основной базы.
+        response = self.client.get(url)
+        self.assertContains(response, 'Пост в основной базе')
+        self.assertNotContains(response, 'Пост на реплике')
+
+    def test_replica_read_before_fresh_generation_not_cached(self):
+        """Страница, часть которой прочитана с реплики, не кэшируется."""
+        post = Post.objects.using(REPLICA).get()
+        bump_generation(post_scope(post.pk))
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(page_key(response.wsgi_request)))
+
+    def test_fresh_profile_cards_rendered(self):
+        """Карточки страницы, прочитанной и с реплики, выводятся без кэша."""
+        Post.objects.create(author=self.author, text='Только что написан')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': self.author})
+        )
+        self.assertContains(response, 'Только что написан')
+        self.assertIsNone(cache.get(page_key(response.wsgi_request)))
+
+    def test_read_primary_after_replica_read(self):
+        router = ReplicaRouter()
+        use_replica(REPLICA)
+        self.addCleanup(use_replica, None)
+        read_primary()
+        self.assertTrue(cacheable())
+        use_replica(REPLICA)
+        router.db_for_read(Post)
+        read_primary()
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertFalse(cacheable())
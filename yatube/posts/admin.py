@@ -1,31 +1,59 @@
-from xml.etree.ElementTree import Comment
-
 from django.contrib import admin
+from django.db.models import Subquery
 
 from .models import Comment, Follow, Group, Post
+from .paginator import EstimatedCountPaginator
+from .search import search_posts
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без COUNT(*) по всей таблице и без списков всех юзеров.
+
+    Связанные объекты выбираются одним запросом со строками, а поля
+    связей заполняются через автодополнение.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
-    list_editable = ('group',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'group')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу (см. posts.search), а не LIKE по всей таблице.
+        if not search_term.strip():
+            return queryset, False
+        found = search_posts(search_term).values('pk')
+        return queryset.filter(pk__in=Subquery(found)), False
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('text', 'author', 'post')
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('text', 'author', 'post', 'created')
+    list_select_related = ('author', 'post')
     search_fields = ('text',)
     list_filter = ('created',)
+    date_hierarchy = 'created'
+    autocomplete_fields = ('author', 'post')
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
     search_fields = ('author__username', 'user__username',)
-    list_filter = ('author',)
+    autocomplete_fields = ('user', 'author')
 
 
-admin.site.register(Group)
+@admin.register(Group)
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'posts_count')
+    search_fields = ('title', 'slug')
@@ -0,0 +1,90 @@
+"""Поколения кэша лент.
+
+У каждой ленты (общей, группы, автора) есть счётчик поколения. Он входит
+в ключ закэшированных фрагментов, поэтому фрагменты можно хранить часами:
+при изменении поста счётчик увеличивается, и следующий запрос читает
+ленту заново, а старые фрагменты просто вытесняются.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import read_primary
+
+KEY = 'feed-generation:{}'
+# Метка недавнего изменения ленты: живёт, пока реплики могут отставать.
+BUMPED_KEY = 'feed-bumped:{}'
+ALL = 'all'
+# Карточки постов: сбрасываются при изменении групп и имён авторов.
+CARDS = 'cards'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scope(post_id):
+    """Страница поста: текст, комментарии."""
+    return f'post:{post_id}'
+
+
+def follow_scope(user_id):
+    """Подписки пользователя: меняются при подписке и отписке."""
+    return f'follow:{user_id}'
+
+
+def post_scopes(post, *old_group_ids):
+    """Ленты, в которых выводится пост."""
+    group_ids = {post.group_id, *old_group_ids} - {None}
+    return (
+        ALL,
+        author_scope(post.author_id),
+        post_scope(post.pk),
+        *(group_scope(group_id) for group_id in group_ids),
+    )
+
+
+def initial_generation():
+    # Начинаем со времени, а не с единицы: если счётчик вытеснят из
+    # кэша, новое поколение не совпадёт ни с одним из прежних.
+    return int(time.time() * 1000)
+
+
+def get_generation(*scopes):
+    """Версия набора лент для ключа кэша.
+
+    Если ленту изменили недавно, реплика могла ещё не получить
+    изменение, и запрос дальше читает из основной базы.
+    """
+    keys = [KEY.format(scope) for scope in scopes]
+    bumped_keys = []
+    if settings.REPLICA_DATABASES:
+        bumped_keys = [BUMPED_KEY.format(scope) for scope in scopes]
+    generations = cache.get_many(keys + bumped_keys)
+    if any(key in generations for key in bumped_keys):
+        read_primary()
+    for key in keys:
+        if key not in generations:
+            cache.add(key, initial_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return '.'.join(str(generations[key]) for key in keys)
+
+
+def bump_generation(*scopes):
+    """Сбрасывает закэшированные фрагменты лент."""
+    for scope in scopes:
+        key = KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, initial_generation(), timeout=None)
+    if settings.REPLICA_DATABASES:
+        cache.set_many(
+            {BUMPED_KEY.format(scope): True for scope in scopes},
+            settings.REPLICA_PIN_SECONDS,
+        )
@@ -0,0 +1,84 @@
+"""Условные ответы HTML-страниц.
+
+ETag страницы собирается из поколений кэша лент (см. posts.cache) и
+того, кто её смотрит: страницы гостя и каждого пользователя разные.
+Браузер или обратный прокси перепроверяют страницу и получают 304 без
+рендеринга шаблонов. Last-Modified не отдаётся: дата последнего поста
+не меняется при правке и удалении постов, комментариях и
+переименованиях, и запрос только с If-Modified-Since получил бы 304 со
+старой страницей.
+"""
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+
+from .cache import (ALL, CARDS, author_scope, follow_scope, get_generation,
+                    group_scope, post_scope)
+from .models import Group, Post, User
+
+
+def viewer(request):
+    user = request.user
+    return f'u{user.pk}' if user.is_authenticated else 'anon'
+
+
+def page_etag(request, *scopes):
+    # Имена авторов и названия групп в карточках сбрасывают CARDS.
+    return f'{viewer(request)}.{get_generation(CARDS, *scopes)}'
+
+
+def index_etag(request):
+    return page_etag(request, ALL)
+
+
+def group_etag(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return page_etag(request, group_scope(group_id))
+
+
+def profile_etag(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    scopes = [author_scope(author_id)]
+    # Кнопка «Подписаться» зависит от подписок того, кто смотрит.
+    if request.user.is_authenticated:
+        scopes.append(follow_scope(request.user.pk))
+    return page_etag(request, *scopes)
+
+
+def post_etag(request, post_id):
+    # Правку поста и любые изменения комментариев сбрасывает post_scope.
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return page_etag(request, author_scope(author_id), post_scope(post_id))
+
+
+def page_cache_control(max_age):
+    """Cache-Control страницы: гостям — общий кэш на max_age секунд.
+
+    Страницы пользователя кэширует только его браузер, перепроверяя
+    их при каждом показе.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(
+                    response, private=True, max_age=0, must_revalidate=True
+                )
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        return wrapper
+    return decorator
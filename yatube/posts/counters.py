@@ -0,0 +1,54 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются одним UPDATE с F()-выражением, поэтому параллельные
+запросы не теряют приращения. Если счётчики всё же разошлись с данными,
+их пересчитывает команда recount.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, User, UserCounters
+
+
+def bump(model, pk, **deltas):
+    """Прибавляет к полям счётчиков объекта model с ключом pk deltas."""
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def bump_user(user_id, **deltas):
+    bump(UserCounters, user_id, **deltas)
+
+
+def count_of(model, field):
+    """Подзапрос: число строк model, у которых field ссылается на строку."""
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def recount():
+    """Пересчитывает все счётчики по данным."""
+    UserCounters.objects.bulk_create(
+        (
+            UserCounters(user_id=user_id)
+            for user_id in User.objects.filter(
+                counters__isnull=True
+            ).values_list('pk', flat=True)
+        ),
+        batch_size=500,
+    )
+    UserCounters.objects.update(
+        posts_count=count_of(Post, 'author'),
+        followers_count=count_of(Follow, 'author'),
+        following_count=count_of(Follow, 'user'),
+    )
+    Group.objects.update(posts_count=count_of(Post, 'group'))
+    Post.objects.update(comments_count=count_of(Comment, 'post'))
@@ -1,6 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
 from .models import Comment, Post
+from .uploads import validate_upload
 
 
 class PostForm(forms.ModelForm):
@@ -20,6 +22,13 @@ class PostForm(forms.ModelForm):
 
         return data
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # Новая загрузка, а не картинка, сохранённая с постом раньше.
+        if isinstance(image, UploadedFile):
+            validate_upload(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
 
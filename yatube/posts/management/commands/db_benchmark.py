@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from posts.models import Comment, Post, User
+from posts.utils import feed_posts
+
+# Переменные окружения процесса замера для каждой базы.
+BACKENDS = {
+    'sqlite': {'DATABASE_BACKEND': 'sqlite', 'SQLITE_TUNING': 'False'},
+    'sqlite-tuned': {'DATABASE_BACKEND': 'sqlite', 'SQLITE_TUNING': 'True'},
+    'postgres': {'DATABASE_BACKEND': 'postgres'},
+}
+
+
+def in_thread(function):
+    """Закрывает соединение потока после работы, как делает сервер."""
+    def wrapper(*args):
+        try:
+            return function(*args)
+        finally:
+            connection.close()
+    return wrapper
+
+
+def write_post(author, number):
+    post = Post.objects.create(author=author, text=f'Пост {number} для замера')
+    Comment.objects.create(
+        post=post, author=author, text='Комментарий для замера'
+    )
+
+
+def read_feed(author, number):
+    list(feed_posts(
+        Post.objects.filter(author=author), preview=True
+    )[:settings.POSTS_PER_PAGE])
+
+
+@in_thread
+def repeat(operation, author, count):
+    """Ошибки «database is locked» и время окончания серии."""
+    errors = 0
+    for number in range(count):
+        try:
+            operation(author, number)
+        except OperationalError:
+            errors += 1
+    return errors, time.perf_counter()
+
+
+def measure(posts, threads):
+    """Одни потоки пишут посты с комментариями, другие в это же время
+    читают ленты."""
+    authors = [
+        User.objects.create_user(username=f'benchmark-{number}')
+        for number in range(threads)
+    ]
+    per_thread = posts // threads
+    with ThreadPoolExecutor(threads * 2) as pool:
+        start = time.perf_counter()
+        writes = [
+            pool.submit(repeat, write_post, author, per_thread)
+            for author in authors
+        ]
+        reads = [
+            pool.submit(repeat, read_feed, author, per_thread)
+            for author in authors
+        ]
+        writes = [future.result() for future in writes]
+        reads = [future.result() for future in reads]
+    return {
+        'operations': per_thread * threads,
+        'errors': sum(errors for errors, _ in writes + reads),
+        'write_seconds': max(end for _, end in writes) - start,
+        'read_seconds': max(end for _, end in reads) - start,
+    }
+
+
+def run_workload(posts, threads):
+    """Замер на чистой тестовой базе текущего бэкенда."""
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            # Потоки должны писать в общий файл, как воркеры сервера, а
+            # не в базу в памяти.
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'benchmark.sqlite3'
+            )
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            return measure(posts, threads)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def probe(backend, posts, threads):
+    env = {
+        **os.environ,
+        **BACKENDS[backend],
+        # Без DEBUG, который запоминает каждый SQL-запрос.
+        'SETTINGS_PROFILE': 'production',
+    }
+    return subprocess.run(
+        [
+            sys.executable,
+            os.path.join(settings.BASE_DIR, 'manage.py'),
+            'db_benchmark', '--probe',
+            '--posts', str(posts), '--threads', str(threads),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает SQLite, SQLite с WAL и PostgreSQL на одновременной '
+        'записи постов и чтении лент'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=400,
+            help='Сколько постов с комментарием создать',
+        )
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Сколько потоков пишут и читают одновременно',
+        )
+        parser.add_argument(
+            '--backend', action='append', choices=tuple(BACKENDS),
+            help='База для сравнения, по умолчанию все',
+        )
+        parser.add_argument('--probe', action='store_true',
+                            help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['probe']:
+            result = run_workload(options['posts'], options['threads'])
+            self.stdout.write(json.dumps(result))
+            return
+        for backend in options['backend'] or BACKENDS:
+            process = probe(backend, options['posts'], options['threads'])
+            if process.returncode:
+                # Например, PostgreSQL не запущен или нет psycopg2.
+                reason = process.stderr.strip().splitlines()[-1:]
+                self.stdout.write(
+                    f'{backend}: пропущен, база недоступна '
+                    f'({"".join(reason)})'
+                )
+                continue
+            result = json.loads(process.stdout)
+            operations = result['operations']
+            self.stdout.write(
+                f'{backend}: {operations} постов с комментарием за '
+                f'{result["write_seconds"]:.2f} с '
+                f'({operations / result["write_seconds"]:.0f}/с, '
+                f'ошибок {result["errors"]}), '
+                f'{operations} чтений лент за '
+                f'{result["read_seconds"]:.2f} с '
+                f'({operations / result["read_seconds"]:.0f}/с)'
+            )
@@ -0,0 +1,40 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import BATCH_SIZE, FORMATS, export_posts, guess_format
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты с комментариями в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл для записи, «-» — стандартный вывод',
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию по расширению',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько постов читать одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        start = time.perf_counter()
+        if path == '-':
+            rows = export_posts(sys.stdout, format, options['batch_size'])
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                rows = export_posts(stream, format, options['batch_size'])
+        seconds = time.perf_counter() - start
+        # При выводе в stdout отчёт не должен попасть в файл.
+        report = self.stderr if path == '-' else self.stdout
+        report.write(self.style.SUCCESS(
+            f'Выгружено записей: {rows} за {seconds:.1f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import refresh_post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт картинки и манифесты для постов, у которых их нет'
+
+    def handle(self, *args, **options):
+        # Условие совпадает с частичным индексом post_missing_manifest.
+        posts = Post.objects.filter(
+            image__gt='', image_manifest=''
+        ).values_list('pk', 'image')
+        for pk, name in posts.iterator():
+            refresh_post(pk, name)
+        self.stdout.write(self.style.SUCCESS('Манифесты картинок созданы'))
@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import (BATCH_SIZE, FORMATS, Importer, guess_format,
+                            read_records)
+
+
+class Command(BaseCommand):
+    help = 'Загружает посты с комментариями из NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл для чтения, «-» — стандартный ввод',
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию по расширению',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько записей сохранять одной транзакцией',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только проверить файл, ничего не записывая',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        importer = Importer(options['batch_size'], options['dry_run'])
+        if path == '-':
+            importer.run(read_records(sys.stdin, format))
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                importer.run(read_records(stream, format))
+
+        for error in importer.errors:
+            self.stderr.write(error)
+        action = 'Проверено' if options['dry_run'] else 'Загружено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} постов: {importer.posts}, '
+            f'комментариев: {importer.comments}, '
+            f'пропущено записей: {importer.skipped} '
+            f'за {importer.seconds:.1f} с ({importer.rate:.0f} строк/с)'
+        ))
+        if importer.images and not options['dry_run']:
+            self.stdout.write(
+                f'Постов с картинками: {importer.images}; файлы картинок '
+                'скопируйте в MEDIA_ROOT и запустите image_manifests'
+            )
@@ -0,0 +1,100 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from posts.models import Post, User
+from posts.search import SearchPaginator, index_posts, search_posts
+from posts.utils import feed_posts
+
+# Редкие слова в разных формах: поиск по основам находит все формы,
+# icontains — только точное совпадение. Запрос — первая форма.
+TOPICS = (
+    ('котики', 'котиков', 'котикам'),
+    ('новость', 'новости', 'новостями'),
+    ('картинка', 'картинки', 'картинкой'),
+    ('подписались', 'подписался', 'подписалась'),
+    ('город', 'городе', 'городами'),
+)
+SYLLABLES = ('ка', 'ро', 'ми', 'ту', 'ле', 'на', 'со', 'ви', 'да', 'пе')
+WORDS_PER_POST = 40
+# Доля постов, в которые попадает редкое слово.
+TOPIC_RATE = 0.01
+
+
+def make_text(rng):
+    words = [
+        ''.join(rng.choices(SYLLABLES, k=3)) for _ in range(WORDS_PER_POST)
+    ]
+    if rng.random() < TOPIC_RATE * len(TOPICS):
+        words[rng.randrange(WORDS_PER_POST)] = rng.choice(rng.choice(TOPICS))
+    return ' '.join(words)
+
+
+def timed(function, repeat):
+    """Медиана времени вызова в миллисекундах."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def baseline(query):
+    return Post.objects.filter(
+        Q(text__icontains=query) | Q(comments__text__icontains=query)
+    ).distinct()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу с поиском по icontains на '
+        'сгенерированных постах'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=5000,
+            help='Сколько постов сгенерировать',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый запрос',
+        )
+
+    def handle(self, *args, **options):
+        per_page = settings.POSTS_PER_PAGE
+        rng = random.Random(0)
+        # Посты и индекс откатываются вместе с транзакцией.
+        with transaction.atomic():
+            author = User.objects.create_user(username='search-benchmark')
+            Post.objects.bulk_create(
+                (
+                    Post(author=author, text=make_text(rng))
+                    for _ in range(options['posts'])
+                ),
+                batch_size=500,
+            )
+            # Индексируются только новые посты, а не вся база.
+            index_posts(author.posts.values_list('pk', flat=True))
+            for query, *_ in TOPICS:
+                indexed_ms = timed(lambda: list(SearchPaginator(
+                    feed_posts(search_posts(query)), per_page
+                ).get_cursor_page()), options['repeat'])
+                baseline_ms = timed(
+                    lambda: list(feed_posts(baseline(query))[:per_page]),
+                    options['repeat'],
+                )
+                found = search_posts(query).values_list('pk', flat=True)
+                self.stdout.write(
+                    f'«{query}»: индекс {indexed_ms:.2f} мс, найдено '
+                    f'{len(found)}; icontains '
+                    f'{baseline_ms:.2f} мс, найдено '
+                    f'{baseline(query).count()}'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Заново строит индекс поиска по постам и комментариям'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild()
+        self.stdout.write(self.style.SUCCESS('Индекс поиска построен'))
@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts import counters, search
+from posts.cache import ALL, bump_generation
+from posts.models import (Comment, Follow, Group, Post, TimelineEntry, User,
+                          UserCounters)
+from posts.seeding import (Plan, chunks, comment_rows, follow_rows,
+                           group_rows, post_rows, user_rows)
+from posts.transfer import create_keeping_dates, max_pk
+
+
+def as_datetime(timestamp):
+    date = datetime.fromtimestamp(timestamp, timezone.utc)
+    return date if settings.USE_TZ else timezone.make_naive(date)
+
+
+def fill_timelines(first_post_id):
+    """Ленты подписчиков для новых постов одним INSERT ... SELECT.
+
+    Как и при публикации, посты «тяжёлых» авторов в ленты не попадают.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            '(user_id, post_id, author_id, pub_date) '
+            'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Post._meta.db_table} p '
+            f'JOIN {Follow._meta.db_table} f ON f.author_id = p.author_id '
+            f'JOIN {UserCounters._meta.db_table} c '
+            'ON c.user_id = p.author_id '
+            'WHERE p.id >= %s AND c.followers_count <= %s',
+            [first_post_id, settings.TIMELINE_FANOUT_LIMIT],
+        )
+        return cursor.rowcount
+
+
+def group_slug(plan, index):
+    return f'load-{plan.seed}-{index}'
+
+
+def reset_sequences():
+    """Ключи заданы явно, поэтому последовательности PostgreSQL отстали."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [User, Group, Post]
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, посты, комментарии и подписки для '
+        'нагрузочных замеров'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок пользователя',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до сегодняшнего распределить посты',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковый seed даёт одинаковые данные',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов, генерирующих строки',
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль пользователей; без него войти нельзя',
+        )
+        parser.add_argument(
+            '--no-search', action='store_true',
+            help='Не строить поисковый индекс (его построит search_index)',
+        )
+
+    def handle(self, *args, **options):
+        if options['posts'] and options['users'] < 1:
+            raise CommandError('Постам нужны авторы: задайте --users')
+        if options['comments'] and not options['posts']:
+            raise CommandError('Комментариям нужны посты: задайте --posts')
+        end = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.plan = Plan(
+            seed=options['seed'],
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            start=(end - timedelta(days=options['days'])).timestamp(),
+            end=end.timestamp(),
+        )
+        if self.loaded():
+            raise CommandError(
+                f'Данные с seed {self.plan.seed} уже загружены'
+            )
+        # Процессы пула не обращаются к базе, поэтому соединение
+        # основного процесса не закрывается перед их запуском.
+        self.pool = None
+        if options['workers'] > 1:
+            self.pool = multiprocessing.Pool(options['workers'])
+        try:
+            self.seed(make_password(options['password']), options)
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+
+    def loaded(self):
+        plan = self.plan
+        if plan.users and User.objects.filter(
+            username=user_rows(plan, (0, 1))[0][1]
+        ).exists():
+            return True
+        return Group.objects.filter(slug=group_slug(plan, 0)).exists()
+
+    def seed(self, password, options):
+        user_base, group_base, post_base = (
+            max_pk(User), max_pk(Group), max_pk(Post)
+        )
+        plan = self.plan
+
+        start = time.perf_counter()
+        Group.objects.bulk_create(
+            Group(
+                pk=group_base + 1 + index,
+                title=title[:200],
+                slug=group_slug(plan, index),
+                description=description,
+            )
+            for index, (title, description) in enumerate(group_rows(plan))
+        )
+        self.report('Группы', plan.groups, start)
+
+        self.load('Пользователи', user_rows, plan.users, lambda rows: [
+            User(
+                pk=user_base + 1 + index,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                password=password,
+            )
+            for index, username, first_name, last_name in rows
+        ])
+        self.load('Посты', post_rows, plan.posts, lambda rows: [
+            Post(
+                pk=post_base + 1 + index,
+                text=text,
+                pub_date=as_datetime(timestamp),
+                author_id=user_base + 1 + author,
+                group_id=None if group is None else group_base + 1 + group,
+            )
+            for index, text, timestamp, author, group in rows
+        ])
+        self.load('Комментарии', comment_rows, plan.comments, lambda rows: [
+            Comment(
+                post_id=post_base + 1 + post,
+                author_id=user_base + 1 + author,
+                text=text,
+                created=as_datetime(timestamp),
+            )
+            for post, author, text, timestamp in rows
+        ])
+        if plan.follows:
+            self.load('Подписки', follow_rows, plan.users, lambda rows: [
+                Follow(user_id=user_base + 1 + user,
+                       author_id=user_base + 1 + author)
+                for user, author in rows
+            ])
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            reset_sequences()
+            counters.recount()
+            entries = fill_timelines(post_base + 1)
+        self.report('Записи лент', entries, start)
+
+        if not options['no_search']:
+            start = time.perf_counter()
+            for first, last in chunks(plan.posts, search.BATCH_SIZE):
+                with transaction.atomic():
+                    search.index_posts(range(
+                        post_base + 1 + first, post_base + 1 + last
+                    ))
+            self.report('Поисковый индекс', plan.posts, start)
+        # Группы и авторы новые: закэшированной была только общая лента.
+        bump_generation(ALL)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные с seed {plan.seed} загружены'
+        ))
+
+    def load(self, title, generate, total, build):
+        """Генерирует строки в пуле и пишет их пакетами по мере готовности.
+
+        imap отдаёт куски по порядку, поэтому порядок строк в базе не
+        зависит от числа процессов.
+        """
+        start = time.perf_counter()
+        parts = chunks(total)
+        generate = partial(generate, self.plan)
+        results = self.pool.imap(generate, parts) if self.pool else map(
+            generate, parts
+        )
+        count = 0
+        for rows in results:
+            objects = build(rows)
+            if not objects:
+                continue
+            with transaction.atomic():
+                create_keeping_dates(type(objects[0]), objects)
+            count += len(objects)
+        self.report(title, count, start)
+
+    def report(self, title, count, start):
+        seconds = time.perf_counter() - start
+        rate = count / seconds if seconds else 0
+        self.stdout.write(
+            f'{title}: {count} за {seconds:.1f} с ({rate:.0f} строк/с)'
+        )
@@ -0,0 +1,75 @@
+"""Кэш целых страниц для гостей.
+
+Стоит в MIDDLEWARE сразу после SecurityMiddleware: гость без куки
+сессии получает закэшированную страницу до сессий, аутентификации, CSRF
+и рендеринга. Кэшируются только страницы, чьи view вызвали
+cache_page_for_guests: вместе со страницей хранится поколение её лент
+(см. posts.cache), и страница отдаётся, только пока оно не изменилось.
+Ответы, ставящие куки, и страницы, часть которых прочитана с отстающей
+реплики (см. core.routers), не кэшируются.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+
+from core.routers import cacheable
+
+from .cache import CARDS, get_generation
+
+KEY = 'page:{}'
+
+
+def cache_page_for_guests(request, *scopes):
+    """Разрешает закэшировать страницу, зависящую от лент scopes.
+
+    Поколение читается до рендеринга: если ленту изменят во время
+    рендеринга, страница сохранится со старым поколением и не будет
+    отдана.
+    """
+    scopes = (CARDS, *scopes)
+    request.page_cache = (scopes, get_generation(*scopes))
+
+
+def page_key(request):
+    path = request.get_full_path().encode()
+    return KEY.format(hashlib.md5(path).hexdigest())
+
+
+class AnonymousPageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def is_guest_get(self, request):
+        return (
+            request.method == 'GET'
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+
+    def __call__(self, request):
+        if not self.is_guest_get(request):
+            return self.get_response(request)
+        key = page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            scopes, generation, response = cached
+            if get_generation(*scopes) == generation:
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    response=response,
+                )
+        response = self.get_response(request)
+        page_cache = getattr(request, 'page_cache', None)
+        if (
+            page_cache is not None
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and cacheable()
+        ):
+            cache.set(
+                key, (*page_cache, response), settings.PAGE_CACHE_TIMEOUT
+            )
+        return response
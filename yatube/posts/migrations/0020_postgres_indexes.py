@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Индексы, которых нет в SQLite; на других базах create_indexes ничего
+# не делает.
+POSTGRES_INDEXES = {
+    # Только посты с картинкой, для которых ещё нет манифеста: их ищет
+    # команда image_manifests. Обычно таких постов единицы (манифест
+    # пишет фоновая задача через секунды после сохранения), так что
+    # индекс почти пуст и почти ничего не стоит при записи, а без него
+    # команда читала бы всю таблицу постов ради нескольких строк.
+    'post_missing_manifest': (
+        'CREATE INDEX post_missing_manifest ON posts_post (id, image) '
+        "WHERE image_manifest = '' AND image > ''"
+    ),
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_INDEXES.values():
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_image_manifest'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+        # Подписчиков автора читает индекс (author, user): он заменяет
+        # индекс внешнего ключа author_id, чтобы запись подписки не
+        # обновляла два индекса с одним и тем же первым столбцом.
+        migrations.AlterField(
+            model_name='follow',
+            name='author',
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='following',
+                to=settings.AUTH_USER_MODEL,
+                verbose_name='Автор',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(
+                fields=['author', 'user'], name='follow_author_user'
+            ),
+        ),
+    ]
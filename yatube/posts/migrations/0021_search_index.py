@@ -0,0 +1,108 @@
+from django.db import migrations
+
+from posts.stemmer import stem_text
+
+# Индекс поиска (см. posts.search); на других базах его нет. Строка на
+# пост и на каждый комментарий: новый комментарий добавляет свою строку,
+# а не переписывает строку поста со всеми комментариями.
+SQLITE_TABLE = (
+    'CREATE VIRTUAL TABLE posts_search USING fts5('
+    'text, comments, post_id UNINDEXED, '
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+# Столбец rank отдаёт BM25 с весами столбцов; в отличие от вызова
+# bm25() его можно суммировать по строкам поста.
+SQLITE_RANK = (
+    "INSERT INTO posts_search (posts_search, rank) "
+    "VALUES ('rank', 'bm25(4.0, 1.0)')"
+)
+POSTGRES_TABLE = (
+    'CREATE TABLE posts_search ('
+    'document_id bigint PRIMARY KEY, '
+    'post_id integer NOT NULL '
+    'REFERENCES posts_post (id) ON DELETE CASCADE DEFERRABLE '
+    'INITIALLY DEFERRED, '
+    'document tsvector NOT NULL)'
+)
+POSTGRES_INDEXES = (
+    'CREATE INDEX posts_search_document ON posts_search USING gin (document)',
+    'CREATE INDEX posts_search_post_id ON posts_search (post_id)',
+)
+POSTGRES_FILL = (
+    """
+    INSERT INTO posts_search (document_id, post_id, document)
+    SELECT -id, id, setweight(to_tsvector('russian', text), 'A')
+    FROM posts_post
+    """,
+    """
+    INSERT INTO posts_search (document_id, post_id, document)
+    SELECT id, post_id, setweight(to_tsvector('russian', text), 'B')
+    FROM posts_comment
+    """,
+)
+BATCH_SIZE = 500
+
+
+def insert_batches(cursor, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            cursor.executemany(sql, batch)
+            batch = []
+    cursor.executemany(sql, batch)
+
+
+def fill_sqlite(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    cursor = schema_editor.connection.cursor()
+    insert_batches(
+        cursor,
+        'INSERT INTO posts_search (rowid, text, post_id) VALUES (%s, %s, %s)',
+        (
+            (-post_id, stem_text(text), post_id)
+            for post_id, text in Post.objects.values_list(
+                'pk', 'text'
+            ).iterator()
+        ),
+    )
+    insert_batches(
+        cursor,
+        'INSERT INTO posts_search (rowid, comments, post_id) '
+        'VALUES (%s, %s, %s)',
+        (
+            (comment_id, stem_text(text), post_id)
+            for comment_id, post_id, text in Comment.objects.values_list(
+                'pk', 'post_id', 'text'
+            ).iterator()
+        ),
+    )
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_TABLE)
+        schema_editor.execute(SQLITE_RANK)
+        fill_sqlite(apps, schema_editor)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_TABLE)
+        for sql in POSTGRES_INDEXES + POSTGRES_FILL:
+            schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS posts_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_postgres_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
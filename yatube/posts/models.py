@@ -18,6 +18,9 @@ class Group(models.Model):
     description = models.TextField(
         'Описание', help_text='Введите описание группы'
     )
+    posts_count = models.PositiveIntegerField(
+        'Число постов', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -52,11 +55,36 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Число комментариев', default=0, editable=False
+    )
+    version = models.PositiveIntegerField(
+        'Версия', default=1, editable=False
+    )
+    # JSON с именами и размерами миниатюры и вариантов картинки; пустой,
+    # пока фоновая задача их не создала (см. posts.thumbnails).
+    image_manifest = models.TextField(
+        'Картинки для вывода', blank=True, default='', editable=False
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = (
+            models.Index(
+                name='post_pub_date_id',
+                fields=('-pub_date', '-id'),
+            ),
+            models.Index(
+                name='post_author_pub_date',
+                fields=('author', '-pub_date', '-id'),
+            ),
+            models.Index(
+                name='post_group_pub_date',
+                fields=('group', '-pub_date', '-id'),
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -85,6 +113,12 @@ class Comment(models.Model):
         ordering = ('-created',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                name='comment_post_created',
+                fields=('post', '-created', '-id'),
+            ),
+        )
 
     def __str__(self):
         return f'{self.text[:15]}, от автора {self.author}'
@@ -97,16 +131,27 @@ class Follow(models.Model):
         related_name='follower',
         verbose_name='Подписчик',
     )
+    # Отдельный индекс внешнего ключа не нужен: его заменяет
+    # follow_author_user.
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='following',
         verbose_name='Автор',
+        db_index=False,
     )
 
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        indexes = (
+            # Раскладка поста по лентам читает подписчиков автора только
+            # из индекса, не обращаясь к таблице.
+            models.Index(
+                name='follow_author_user',
+                fields=('author', 'user'),
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 name='unique subscription',
@@ -120,3 +165,79 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'Юзер {self.user} подписан на автора {self.author}'
+
+
+class UserCounters(models.Model):
+    """Счётчики пользователя, которые иначе пришлось бы считать COUNT(*)."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков', default=0
+    )
+    following_count = models.PositiveIntegerField(
+        'Число подписок', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self):
+        return f'Счётчики юзера {self.user}'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя.
+
+    Заполняется при публикации поста (fan-out on write), поэтому лента
+    подписок читается из одной таблицы без соединения Follow и Post.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = (
+            models.UniqueConstraint(
+                name='unique timeline entry',
+                fields=('user', 'post',),
+            ),
+        )
+        indexes = (
+            models.Index(
+                name='timeline_user_pub_date',
+                fields=('user', '-pub_date', '-post'),
+            ),
+            models.Index(
+                name='timeline_user_author',
+                fields=('user', 'author'),
+            ),
+        )
+
+    def __str__(self):
+        return f'Пост {self.post_id} в ленте юзера {self.user}'
@@ -0,0 +1,182 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+# До этого числа записей COUNT(*) дёшев и считается точно.
+EXACT_COUNT_LIMIT = 10000
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (дата, id), по умолчанию (pub_date, id).
+
+    Страница выбирается условием по ключу последней записи предыдущей
+    страницы, поэтому запрос не зависит от глубины листания и обходится
+    без COUNT(*) и OFFSET. Номерные страницы (?page=N) по-прежнему
+    доступны через унаследованные методы Paginator.
+    """
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id'),
+                 **kwargs):
+        self.keys = keys
+        object_list = object_list.order_by(*(f'-{key}' for key in keys))
+        super().__init__(object_list, per_page, **kwargs)
+
+    def row_key(self, obj):
+        # Строки бывают и моделями, и словарями из values().
+        if isinstance(obj, dict):
+            return tuple(obj[key] for key in self.keys)
+        return tuple(getattr(obj, key) for key in self.keys)
+
+    def encode_cursor(self, obj):
+        date, pk = self.row_key(obj)
+        value = f'{date.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Возвращает (дата, id) или None для битого курсора."""
+        try:
+            value = base64.urlsafe_b64decode(cursor.encode()).decode()
+            date, pk = value.rsplit('|', 1)
+            date, pk = parse_datetime(date), int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if date is None:
+            return None
+        return date, pk
+
+    def get_cursor_page(self, after=None, before=None):
+        """Страница записей старше курсора after или новее курсора before.
+
+        Без курсора (или с неразборчивым курсором) отдаётся первая
+        страница ленты.
+        """
+        date_field, id_field = self.keys
+        queryset = self.object_list
+        key = None
+        if after:
+            key = self.decode_cursor(after)
+            if key is not None:
+                date, pk = key
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__lt': date})
+                    | Q(**{date_field: date, f'{id_field}__lt': pk})
+                )
+        elif before:
+            key = self.decode_cursor(before)
+            if key is not None:
+                date, pk = key
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__gt': date})
+                    | Q(**{date_field: date, f'{id_field}__gt': pk})
+                ).reverse()
+
+        rows = CursorRows(
+            self,
+            queryset,
+            backwards=not after and key is not None,
+            has_key=key is not None,
+        )
+        page = Page(rows, 1, self)
+        page.is_cursor = True
+        page.cursor = rows
+        return page
+
+
+class CursorRows(Sequence):
+    """Строки страницы по курсору и курсоры соседних страниц.
+
+    Запрос выполняется при первом обращении, поэтому страница, которую
+    шаблон берёт из кэша фрагментов, не стоит ни одного запроса к базе.
+    """
+
+    def __init__(self, paginator, queryset, backwards, has_key):
+        self.paginator = paginator
+        self.queryset = queryset
+        self.backwards = backwards
+        self.has_key = has_key
+        self._rows = None
+
+    def fetch(self):
+        if self._rows is not None:
+            return self._rows
+        per_page = self.paginator.per_page
+        rows = list(self.queryset[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if self.backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_key
+        self._rows = rows
+        return rows
+
+    def __getitem__(self, index):
+        return self.fetch()[index]
+
+    def __len__(self):
+        return len(self.fetch())
+
+    @property
+    def next_cursor(self):
+        rows = self.fetch()
+        if rows and self.has_next:
+            return self.paginator.encode_cursor(rows[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        rows = self.fetch()
+        if rows and self.has_previous:
+            return self.paginator.encode_cursor(rows[0])
+        return None
+
+
+def estimate_count(queryset):
+    """Примерное число строк таблицы без COUNT(*) или None.
+
+    Оценка — наибольший id: он не меньше числа строк, так что лишними
+    могут оказаться только пустые последние страницы. Статистика
+    планировщика PostgreSQL (reltuples) бывает и меньше числа строк,
+    и тогда последние страницы не открылись бы, поэтому она только
+    поднимает оценку.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return None
+    last = queryset.aggregate(last=Max('pk'))['last'] or 0
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 — таблицу ещё не анализировали.
+        if row is not None:
+            return max(int(row[0]), last)
+    return last
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки с примерным числом записей в больших таблицах.
+
+    Оценка используется только для списка без фильтров и поиска: с ними
+    записей обычно немного, и они считаются точно.
+    """
+
+    exact_count_limit = EXACT_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate > self.exact_count_limit:
+                return estimate
+        return super().count
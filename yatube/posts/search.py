@@ -0,0 +1,216 @@
+"""Полнотекстовый поиск по постам и их комментариям.
+
+Индекс — таблица posts_search, строка на документ: на текст поста и на
+каждый комментарий, с id поста в post_id. Ключ строки поста — -id
+поста, строки комментария — id комментария, так что новый или
+удалённый комментарий меняет одну свою строку, а не переписывает все
+комментарии поста. В SQLite это виртуальная таблица FTS5 с текстом,
+приведённым к основам слов (см. posts.stemmer), в PostgreSQL — tsvector
+с конфигурацией 'russian' и GIN-индексом. Таблицу создаёт миграция
+0021, а обновляют сигналы.
+
+Релевантность поста — сумма релевантностей его документов (BM25 в
+SQLite, ts_rank в PostgreSQL), совпадение в тексте поста весит больше,
+чем в комментариях. Все слова запроса должны встретиться в одном
+документе. На остальных базах поиск идёт по icontains без ранжирования.
+"""
+import base64
+import binascii
+import math
+
+from django.db import connection
+from django.db.models import FloatField, Q, Sum, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post
+from .paginator import CursorPaginator
+from .stemmer import stem_text, stem_words
+
+TABLE = 'posts_search'
+SEARCH_KEYS = ('score', 'id')
+BATCH_SIZE = 500
+NO_SCORE = Value(0.0, output_field=FloatField())
+
+# Веса BM25 задаёт настройка rank таблицы (см. миграцию 0021).
+SQLITE_SCORE = f'-{TABLE}.rank'
+POSTGRES_QUERY = "plainto_tsquery('russian', %s)"
+POSTGRES_DOCUMENT = "setweight(to_tsvector('russian', %s), '{}')"
+POST_WEIGHT, COMMENT_WEIGHT = 'A', 'B'
+
+
+def indexed():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def document_key():
+    return 'rowid' if connection.vendor == 'sqlite' else 'document_id'
+
+
+def remove_documents(keys):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE {document_key()} = %s',
+            [(key,) for key in keys],
+        )
+
+
+def write_documents(documents, weight):
+    """Заменяет строки индекса: documents — [(ключ, id поста, текст)].
+
+    В SQLite текст поста пишется в столбец text, комментария — в
+    comments; в PostgreSQL они различаются весом.
+    """
+    documents = list(documents)
+    remove_documents(key for key, _, _ in documents)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            column = 'text' if weight == POST_WEIGHT else 'comments'
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (rowid, post_id, {column}) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (key, post_id, stem_text(text))
+                    for key, post_id, text in documents
+                ],
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (document_id, post_id, document) '
+                f'VALUES (%s, %s, {POSTGRES_DOCUMENT.format(weight)})',
+                documents,
+            )
+
+
+def write_posts(posts):
+    """Заменяет строки постов: posts — [(id, текст)]."""
+    if indexed():
+        write_documents(
+            ((-post_id, post_id, text) for post_id, text in posts),
+            POST_WEIGHT,
+        )
+
+
+def write_comments(comments):
+    """Заменяет строки комментариев: comments — [(id, id поста, текст)]."""
+    if indexed():
+        write_documents(comments, COMMENT_WEIGHT)
+
+
+def remove_posts(post_ids):
+    """Убирает строки постов; строки комментариев убирают их сигналы."""
+    if indexed():
+        remove_documents(-post_id for post_id in post_ids)
+
+
+def remove_comments(comment_ids):
+    if indexed():
+        remove_documents(comment_ids)
+
+
+def index_post(post):
+    write_posts([(post.pk, post.text)])
+
+
+def index_comment(comment):
+    write_comments([(comment.pk, comment.post_id, comment.text)])
+
+
+def index_posts(post_ids):
+    """Заново пишет строки постов и всех их комментариев.
+
+    Для пересборки и массовой загрузки; строки удалённых постов
+    убираются.
+    """
+    if not indexed():
+        return
+    post_ids = list(post_ids)
+    posts = list(
+        Post.objects.filter(pk__in=post_ids).values_list('pk', 'text')
+    )
+    remove_posts(set(post_ids) - {post_id for post_id, _ in posts})
+    write_posts(posts)
+    write_comments(
+        Comment.objects.filter(post__in=post_ids).order_by().values_list(
+            'pk', 'post_id', 'text'
+        )
+    )
+
+
+def rebuild():
+    """Заново строит индекс по всем постам."""
+    if not indexed():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    post_ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+    batch = []
+    for post_id in post_ids.iterator():
+        batch.append(post_id)
+        if len(batch) == BATCH_SIZE:
+            index_posts(batch)
+            batch = []
+    index_posts(batch)
+
+
+def no_posts():
+    return Post.objects.none().annotate(score=NO_SCORE)
+
+
+def search_posts(query):
+    """Посты, подходящие под запрос, с релевантностью в поле score."""
+    if connection.vendor == 'sqlite':
+        words = stem_words(query)
+        if not words:
+            return no_posts()
+        # Каждое слово в кавычках: синтаксис FTS5 в запросе не работает.
+        match = ' '.join(f'"{word}"' for word in words)
+        return Post.objects.extra(
+            tables=[TABLE],
+            where=[f'{TABLE}.post_id = posts_post.id', f'{TABLE} MATCH %s'],
+            params=[match],
+        ).annotate(score=Sum(
+            RawSQL(SQLITE_SCORE, ()), output_field=FloatField()
+        ))
+    if not query.strip():
+        return no_posts()
+    if connection.vendor == 'postgresql':
+        return Post.objects.extra(
+            tables=[TABLE],
+            where=[
+                f'{TABLE}.post_id = posts_post.id',
+                f'{TABLE}.document @@ {POSTGRES_QUERY}',
+            ],
+            params=[query],
+        ).annotate(score=Sum(
+            RawSQL(
+                f'ts_rank({TABLE}.document, {POSTGRES_QUERY})', (query,)
+            ),
+            output_field=FloatField(),
+        ))
+    return Post.objects.filter(
+        Q(text__icontains=query) | Q(comments__text__icontains=query)
+    ).distinct().annotate(score=NO_SCORE)
+
+
+class SearchPaginator(CursorPaginator):
+    """Пагинатор по (релевантность, id), лучшие совпадения первыми."""
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list, per_page, SEARCH_KEYS, **kwargs)
+
+    def encode_cursor(self, obj):
+        score, pk = self.row_key(obj)
+        value = f'{score!r}|{pk}'
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Возвращает (релевантность, id) или None для битого курсора."""
+        try:
+            value = base64.urlsafe_b64decode(cursor.encode()).decode()
+            score, pk = value.rsplit('|', 1)
+            score, pk = float(score), int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if not math.isfinite(score):
+            return None
+        return score, pk
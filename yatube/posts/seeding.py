@@ -0,0 +1,162 @@
+"""Генерация данных для нагрузочных замеров (команда seed_load_data).
+
+Строки генерируются кусками в процессах пула и возвращаются кортежами,
+а пишет их в базу основной процесс. Поэтому модуль не обращается к
+базе и к моделям: процессам не нужны соединения и настроенный Django.
+
+Куски постоянного размера CHUNK_SIZE, и каждый получает свой генератор
+случайных чисел из seed, вида данных и начала куска, так что данные
+зависят только от seed и количеств строк, но не от числа процессов и
+порядка, в котором они закончат работу. Популярность пользователей,
+групп и постов распределена по степенному закону: у первых по номеру
+пользователей огромное число подписчиков, а число постов авторов
+распределено по тому же закону, но в другом порядке.
+"""
+import math
+import random
+from collections import namedtuple
+
+from faker import Faker
+
+LOCALE = 'ru_RU'
+CHUNK_SIZE = 2000
+# Шаг перестановки авторов постов, см. scatter.
+STRIDE = 7919
+# Доля постов без группы.
+NO_GROUP_RATE = 0.3
+# Среднее время от поста до комментария, в секундах.
+COMMENT_DELAY = 6 * 3600
+
+Plan = namedtuple(
+    'Plan', 'seed users groups posts comments follows start end'
+)
+
+_fakers = {}
+
+
+def chunk_rng(plan, kind, start):
+    return random.Random(f'{plan.seed}:{kind}:{start}')
+
+
+def get_faker(rng):
+    """Faker процесса, засеянный генератором куска."""
+    if LOCALE not in _fakers:
+        _fakers[LOCALE] = Faker(LOCALE)
+    faker = _fakers[LOCALE]
+    faker.seed_instance(rng.getrandbits(32))
+    return faker
+
+
+def zipf_index(rng, count):
+    """Номер от 0 до count - 1 с вероятностью примерно 1 / (номер + 1)."""
+    return int((count + 1) ** rng.random()) - 1
+
+
+def scatter(index, count):
+    """Номер index в перестановке чисел от 0 до count - 1.
+
+    Самые пишущие авторы не совпадают с самыми популярными: иначе у
+    авторов с наибольшим числом подписчиков была бы и наибольшая доля
+    постов, а лента подписок росла бы как произведение двух хвостов.
+    """
+    stride = STRIDE
+    while math.gcd(stride, count) != 1:
+        stride += 2
+    return (index + 1) * stride % count
+
+
+def chunks(total, size=CHUNK_SIZE):
+    return [
+        (start, min(start + size, total)) for start in range(0, total, size)
+    ]
+
+
+def post_time(plan, index):
+    """Время поста: посты равномерно идут от start до end по номерам."""
+    return plan.start + (plan.end - plan.start) * (index + 0.5) / plan.posts
+
+
+def group_rows(plan):
+    """[(название, описание)] групп."""
+    faker = get_faker(chunk_rng(plan, 'groups', 0))
+    return [
+        (faker.sentence(nb_words=2).rstrip('.'), faker.paragraph())
+        for _ in range(plan.groups)
+    ]
+
+
+def user_rows(plan, chunk):
+    """[(номер, имя пользователя, имя, фамилия)]."""
+    start, stop = chunk
+    faker = get_faker(chunk_rng(plan, 'users', start))
+    # Номер и seed в имени делают имена уникальными.
+    return [
+        (
+            index,
+            f'{faker.user_name()}_{plan.seed}_{index}',
+            faker.first_name(),
+            faker.last_name(),
+        )
+        for index in range(start, stop)
+    ]
+
+
+def post_rows(plan, chunk):
+    """[(номер, текст, время, номер автора, номер группы или None)]."""
+    start, stop = chunk
+    rng = chunk_rng(plan, 'posts', start)
+    faker = get_faker(rng)
+    rows = []
+    for index in range(start, stop):
+        group = None
+        if plan.groups and rng.random() >= NO_GROUP_RATE:
+            group = zipf_index(rng, plan.groups)
+        rows.append((
+            index,
+            faker.paragraph(nb_sentences=rng.randint(1, 6)),
+            post_time(plan, index),
+            scatter(zipf_index(rng, plan.users), plan.users),
+            group,
+        ))
+    return rows
+
+
+def comment_rows(plan, chunk):
+    """[(номер поста, номер автора, текст, время)]."""
+    start, stop = chunk
+    rng = chunk_rng(plan, 'comments', start)
+    faker = get_faker(rng)
+    rows = []
+    for _ in range(start, stop):
+        post = zipf_index(rng, plan.posts)
+        created = post_time(plan, post) + rng.expovariate(1 / COMMENT_DELAY)
+        rows.append((
+            post,
+            rng.randrange(plan.users),
+            faker.sentence(nb_words=rng.randint(3, 15)),
+            min(created, plan.end),
+        ))
+    return rows
+
+
+def follow_rows(plan, chunk):
+    """[(номер подписчика, номер автора)] без повторов и самоподписок.
+
+    Число подписок пользователя распределено экспоненциально со
+    средним plan.follows, авторы выбираются по степенному закону.
+    """
+    start, stop = chunk
+    rng = chunk_rng(plan, 'follows', start)
+    rows = []
+    for user in range(start, stop):
+        wanted = min(int(rng.expovariate(1 / plan.follows)), plan.users - 1)
+        authors = set()
+        # Популярных авторов выбирают часто: попыток с запасом.
+        for _ in range(wanted * 3):
+            if len(authors) == wanted:
+                break
+            author = zipf_index(rng, plan.users)
+            if author != user:
+                authors.add(author)
+        rows.extend((user, author) for author in sorted(authors))
+    return rows
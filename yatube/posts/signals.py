@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import counters, search, thumbnails, timeline
+from .cache import (ALL, CARDS, bump_generation, follow_scope, group_scope,
+                    post_scope, post_scopes)
+from .models import Comment, Follow, Group, Post, User, UserCounters
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        UserCounters.objects.get_or_create(user=instance)
+    elif update_fields != frozenset(('last_login',)):
+        # Имя автора выводится в карточках постов.
+        bump_generation(CARDS)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    # Запоминаем группу, чтобы при правке поста перенести его в счётчиках.
+    # Через __dict__, чтобы не загружать отложенное поле.
+    instance._saved_group_id = instance.__dict__.get('group_id')
+    instance._saved_image = saved_image_name(instance)
+
+
+def saved_image_name(post):
+    image = post.__dict__.get('image')
+    return getattr(image, 'name', image) or ''
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, **kwargs):
+    # Новая версия поста — новый ключ его закэшированных карточек.
+    if instance.pk is not None and not instance._state.adding:
+        instance.version += 1
+    # Картинки для вывода относятся к прежнему файлу.
+    if (instance.image.name or '') != instance._saved_image:
+        instance.image_manifest = ''
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    bump_generation(*post_scopes(instance, instance._saved_group_id))
+    search.index_post(instance)
+    if created:
+        counters.bump_user(instance.author_id, posts_count=1)
+        counters.bump(Group, instance.group_id, posts_count=1)
+        timeline.fan_out_post(instance)
+    elif instance._saved_group_id != instance.group_id:
+        counters.bump(Group, instance._saved_group_id, posts_count=-1)
+        counters.bump(Group, instance.group_id, posts_count=1)
+    instance._saved_group_id = instance.group_id
+    if not instance.image_manifest:
+        thumbnails.schedule(instance)
+    instance._saved_image = instance.image.name or ''
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    bump_generation(*post_scopes(instance))
+    search.remove_posts([instance.pk])
+    counters.bump_user(instance.author_id, posts_count=-1)
+    counters.bump(Group, instance.group_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    # Название группы выводится в общей ленте и в карточках постов.
+    bump_generation(ALL, CARDS, group_scope(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    bump_generation(post_scope(instance.post_id))
+    search.index_comment(instance)
+    if created:
+        counters.bump(Post, instance.post_id, comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    bump_generation(post_scope(instance.post_id))
+    search.remove_comments([instance.pk])
+    counters.bump(Post, instance.post_id, comments_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_user(instance.author_id, followers_count=1)
+        counters.bump_user(instance.user_id, following_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        bump_generation(follow_scope(instance.user_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, followers_count=-1)
+    counters.bump_user(instance.user_id, following_count=-1)
+    timeline.prune(instance.user_id, instance.author_id)
+    bump_generation(follow_scope(instance.user_id))
+    # Автор только что перестал быть «тяжёлым»: его посты больше не
+    # подмешиваются при чтении, поэтому раскладываем их по лентам.
+    count = timeline.followers_count(instance.author_id)
+    if count == settings.TIMELINE_FANOUT_LIMIT:
+        timeline.schedule_backfill(instance.author_id)
@@ -0,0 +1,124 @@
+"""Стеммер русского языка по алгоритму Snowball.
+
+Нужен для полнотекстового поиска в SQLite: токенизатор FTS5 не знает
+русской морфологии, поэтому посты и запросы приводятся к основам до
+записи в индекс (см. posts.search). PostgreSQL делает то же сам
+(конфигурация 'russian').
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD = re.compile(r'\w+')
+
+
+def endings(after_a=(), other=()):
+    """Окончания, длинные первыми; after_a — только после «а» или «я»."""
+    found = [(ending, True) for ending in after_a]
+    found += [(ending, False) for ending in other]
+    return sorted(found, key=lambda item: -len(item[0]))
+
+
+PERFECTIVE_GERUND = endings(
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = endings(other=(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = endings(
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = endings(other=('ся', 'сь'))
+VERB = endings(
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = endings(other=(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+))
+DERIVATIONAL = endings(other=('ост', 'ость'))
+SUPERLATIVE = endings(other=('ейш', 'ейше'))
+
+
+def region_after_vowel(word, start=0):
+    """Начало области после первой гласной, за которой идёт согласная."""
+    for index in range(start + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def remove_ending(word, start, candidates):
+    """Слово без самого длинного окончания из candidates или None.
+
+    Окончание должно целиком лежать не раньше позиции start.
+    """
+    for ending, after_a in candidates:
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            stem = word[:-len(ending)]
+            if after_a and (len(stem) <= start or stem[-1] not in 'ая'):
+                return None
+            return stem
+    return None
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    vowel = next(
+        (index for index, char in enumerate(word) if char in VOWELS), None
+    )
+    if vowel is None:
+        return word
+    rv = vowel + 1
+    r2 = region_after_vowel(word, region_after_vowel(word))
+
+    # Шаг 1: деепричастие, иначе возвратность и одно из окончаний
+    # прилагательного, глагола или существительного.
+    stripped = remove_ending(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = remove_ending(word, rv, REFLEXIVE) or word
+        stripped = remove_ending(word, rv, ADJECTIVE)
+        if stripped is not None:
+            stripped = remove_ending(stripped, rv, PARTICIPLE) or stripped
+        else:
+            stripped = (
+                remove_ending(word, rv, VERB)
+                or remove_ending(word, rv, NOUN)
+            )
+    if stripped is not None:
+        word = stripped
+
+    # Шаг 2.
+    if word.endswith('и') and len(word) > rv:
+        word = word[:-1]
+
+    # Шаг 3: словообразовательные окончания в R2.
+    word = remove_ending(word, r2, DERIVATIONAL) or word
+
+    # Шаг 4: превосходная степень, двойное «н» и мягкий знак.
+    stripped = remove_ending(word, rv, SUPERLATIVE)
+    if stripped is not None:
+        word = stripped
+    if word.endswith('нн') and len(word) - 1 > rv:
+        word = word[:-1]
+    elif stripped is None and word.endswith('ь') and len(word) > rv:
+        word = word[:-1]
+    return word
+
+
+def stem_words(text):
+    """Основы слов текста в порядке появления."""
+    return [stem(word) for word in WORD.findall(text)]
+
+
+def stem_text(text):
+    return ' '.join(stem_words(text))
@@ -0,0 +1,45 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from core.routers import cacheable
+
+from ..cache import CARDS, get_generation
+
+register = template.Library()
+
+CARD_KEY = 'post-card:{variant}:{generation}:{pk}:{version}'
+
+
+@register.simple_tag
+def post_cards(posts, variant):
+    """Отрендеренные карточки постов ленты одним чтением из кэша.
+
+    Карточка зависит только от поста, поэтому кэшируется по его id и
+    версии; недостающие карточки рендерятся и кладутся в кэш.
+    """
+    posts = list(posts)
+    generation = get_generation(CARDS)
+    keys = [
+        CARD_KEY.format(
+            variant=variant,
+            generation=generation,
+            pk=post.pk,
+            version=post.version,
+        )
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    rendered = {}
+    card_template = get_template(f'posts/includes/card_{variant}.html')
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            rendered[key] = card_template.render({'post': post})
+    # Карточки, отрисованные после чтения с реплики, не кэшируются, но
+    # выводятся.
+    if rendered and cacheable():
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
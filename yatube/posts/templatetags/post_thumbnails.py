@@ -0,0 +1,38 @@
+import json
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+SIZES = '(max-width: 960px) 100vw, 960px'
+SOURCE = '<source type="{}" srcset="{}" sizes="{}">'
+
+
+@register.simple_tag
+def post_picture(image_manifest):
+    """<picture> с вариантами картинки по srcset и миниатюрой в <img>.
+
+    Всё берётся из манифеста картинок поста, без обращений к файлам.
+    """
+    manifest = json.loads(image_manifest)
+    url = default_storage.url
+    sources = format_html_join('', SOURCE, (
+        (
+            source['type'],
+            ', '.join(
+                f'{url(name)} {width}w' for width, name in source['srcset']
+            ),
+            SIZES,
+        )
+        for source in manifest['sources']
+    ))
+    return format_html(
+        '<picture>{}<img class="card-img my-2" src="{}" width="{}" '
+        'height="{}"></picture>',
+        sources,
+        url(manifest['src']),
+        manifest['width'],
+        manifest['height'],
+    )
@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+from ..paginator import EstimatedCountPaginator
+
+POST_CHANGELIST_URL = reverse('admin:posts_post_changelist')
+COMMENT_CHANGELIST_URL = reverse('admin:posts_comment_changelist')
+FOLLOW_CHANGELIST_URL = reverse('admin:posts_follow_changelist')
+POST_ADD_URL = reverse('admin:posts_post_add')
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='AdminUser', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.admin, group=cls.group, text='Смешные котики'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        for number in range(start, start + count):
+            author = User.objects.create_user(username=f'Author{number}')
+            Follow.objects.create(user=self.admin, author=author)
+            post = Post.objects.create(
+                author=author, group=self.group, text=f'Пост {number}'
+            )
+            Comment.objects.create(
+                post=post, author=author, text=f'Комментарий {number}'
+            )
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число запросов списка не зависит от числа строк."""
+        urls = (POST_CHANGELIST_URL, COMMENT_CHANGELIST_URL,
+                FOLLOW_CHANGELIST_URL)
+        self.add_rows(1)
+        before = [self.queries(url) for url in urls]
+        self.add_rows(10)
+        self.assertEqual([self.queries(url) for url in urls], before)
+
+    def test_relations_use_autocomplete(self):
+        """Автор и группа выбираются автодополнением, без списка всех."""
+        response = self.admin_client.get(POST_ADD_URL)
+        self.assertContains(response, 'data-ajax--url', count=2)
+        self.assertNotContains(response, f'>{self.admin.username}</option>')
+
+    def test_follow_filter_does_not_list_users(self):
+        """В списке подписок нет фильтра со всеми авторами."""
+        self.add_rows(3)
+        response = self.admin_client.get(FOLLOW_CHANGELIST_URL)
+        self.assertNotContains(response, 'id="changelist-filter"')
+
+    def test_search_uses_index(self):
+        """Поиск постов в админке находит другие формы слова."""
+        response = self.admin_client.get(POST_CHANGELIST_URL, {'q': 'котик'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post]
+        )
+
+    def test_date_hierarchy(self):
+        """Список постов можно листать по датам публикации."""
+        date = self.post.pub_date
+        response = self.admin_client.get(POST_CHANGELIST_URL, {
+            'pub_date__year': date.year,
+            'pub_date__month': date.month,
+        })
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post]
+        )
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='CountAuthor')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}')
+            for number in range(5)
+        ]
+        cls.posts[0].delete()
+
+    def paginator(self, queryset, limit):
+        paginator = EstimatedCountPaginator(queryset.order_by('pk'), 2)
+        paginator.exact_count_limit = limit
+        return paginator
+
+    def test_small_tables_counted_exactly(self):
+        """Небольшая таблица считается точно."""
+        self.assertEqual(self.paginator(Post.objects.all(), 100).count, 4)
+
+    def test_large_table_estimated(self):
+        """Большая таблица без фильтров считается без COUNT(*)."""
+        paginator = self.paginator(Post.objects.all(), 0)
+        with CaptureQueriesContext(connection) as queries:
+            count = paginator.count
+        self.assertGreaterEqual(count, 4)
+        self.assertNotIn('COUNT(', queries[0]['sql'])
+
+    def test_last_page_opens(self):
+        """Оценка не меньше числа строк: открываются все страницы."""
+        paginator = self.paginator(Post.objects.all(), 0)
+        shown = [
+            post
+            for number in paginator.page_range
+            for post in paginator.page(number)
+        ]
+        self.assertEqual(shown, self.posts[1:])
+
+    def test_filtered_counted_exactly(self):
+        """Отфильтрованные записи считаются точно."""
+        posts = Post.objects.filter(author=self.author)
+        self.assertEqual(self.paginator(posts, 0).count, 4)
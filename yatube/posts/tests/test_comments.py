@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+@override_settings(COMMENTS_PER_PAGE=10)
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='CommentAuthor')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'Комментарий {i}'
+            )
+            for i in range(25)
+        ]
+        cls.POST_DETAIL_PAGE_URL = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+        cls.COMMENTS_URL = reverse(
+            'posts:post_comments', kwargs={'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_detail_renders_first_batch(self):
+        """На странице поста только первая страница комментариев."""
+        # версия поста для ETag, пост, комментарии
+        with self.assertNumQueries(3):
+            response = self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        self.assertEqual(
+            list(response.context['comment']), self.comments[:-11:-1]
+        )
+        self.assertContains(response, 'id="more-comments"')
+
+    def test_json_pages_cover_all_comments(self):
+        """JSON-страницы отдают остальные комментарии по курсору."""
+        response = self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        after = response.context['comments_page'].cursor.next_cursor
+        texts = [comment.text for comment in response.context['comment']]
+        while after:
+            with self.assertNumQueries(2):
+                data = self.guest_client.get(
+                    self.COMMENTS_URL, {'after': after}
+                ).json()
+            texts += [comment['text'] for comment in data['comments']]
+            after = data['next']
+        self.assertEqual(
+            texts, [comment.text for comment in reversed(self.comments)]
+        )
+
+    def test_next_batch_without_script(self):
+        """Ссылка «Показать ещё» работает и без скрипта."""
+        response = self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        after = response.context['comments_page'].cursor.next_cursor
+        response = self.guest_client.get(
+            self.POST_DETAIL_PAGE_URL, {'comments_after': after}
+        )
+        self.assertEqual(
+            list(response.context['comment']), self.comments[-11:-21:-1]
+        )
+
+    def test_comments_of_missing_post(self):
+        """Комментарии несуществующего поста — 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
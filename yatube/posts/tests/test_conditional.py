@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+MAIN_PAGE_URL = reverse('posts:index')
+
+
+class ConditionalPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='EtagAuthor')
+        cls.reader = User.objects.create_user(username='EtagReader')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='etag-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост'
+        )
+        cls.POST_DETAIL_PAGE_URL = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+        cls.PROFILE_PAGE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.author.username}
+        )
+        cls.urls = (
+            MAIN_PAGE_URL,
+            reverse('posts:group_posts', kwargs={'slug': cls.group.slug}),
+            cls.PROFILE_PAGE_URL,
+            cls.POST_DETAIL_PAGE_URL,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def revalidate(self, client, url, response):
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_pages_not_modified(self):
+        """Неизменившаяся страница отдаёт 304 без рендеринга."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                response = self.revalidate(self.guest_client, url, response)
+                self.assertEqual(response.status_code, 304)
+                self.assertIsNone(response.context)
+
+    def test_edit_changes_etag(self):
+        """Правка поста меняет ETag всех его страниц."""
+        responses = {url: self.guest_client.get(url) for url in self.urls}
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                response = self.revalidate(self.guest_client, url, response)
+                self.assertEqual(response.status_code, 200)
+
+    def test_comment_changes_post_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        response = self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        response = self.revalidate(
+            self.guest_client, self.POST_DETAIL_PAGE_URL, response
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_replaced_comment_changes_post_etag(self):
+        """Замена комментария при том же их числе меняет ETag поста."""
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Старый комментарий'
+        )
+        response = self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        comment.delete()
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий'
+        )
+        response = self.revalidate(
+            self.guest_client, self.POST_DETAIL_PAGE_URL, response
+        )
+        self.assertContains(response, 'Новый комментарий')
+        self.assertNotContains(response, 'Старый комментарий')
+
+    def test_etag_differs_by_viewer(self):
+        """Гость и пользователь не получают страниц друг друга."""
+        response = self.guest_client.get(MAIN_PAGE_URL)
+        response = self.revalidate(
+            self.authorized_client, MAIN_PAGE_URL, response
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_changes_profile_etag(self):
+        """Подписка меняет ETag профиля для подписчика."""
+        response = self.authorized_client.get(self.PROFILE_PAGE_URL)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.revalidate(
+            self.authorized_client, self.PROFILE_PAGE_URL, response
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['following'])
+
+    def test_if_modified_since_ignored(self):
+        """Правка поста видна и при одном If-Modified-Since."""
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+                )
+                self.assertContains(response, 'Исправленный пост')
+
+    def test_cache_control(self):
+        """Гостевые страницы общие, страницы пользователя — личные."""
+        response = self.guest_client.get(MAIN_PAGE_URL)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=30', response['Cache-Control'])
+        self.assertNotIn('Last-Modified', response)
+        response = self.authorized_client.get(MAIN_PAGE_URL)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('must-revalidate', response['Cache-Control'])
@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User, UserCounters
+
+POST_CREATE_PAGE_URL = reverse('posts:post_create')
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='CounterAuthor')
+        cls.reader = User.objects.create_user(username='CounterReader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа 1',
+            slug='test-slug-1',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def counters(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счётчики."""
+        self.authorized_client.post(
+            POST_CREATE_PAGE_URL,
+            data={'text': 'Тестовый пост', 'group': self.group.pk},
+        )
+        post = Post.objects.get()
+        self.assertEqual(self.counters(self.author).posts_count, 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+
+        Post.objects.all().delete()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.counters(self.author).posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_comment_counter(self):
+        """Комментарии учитываются в счётчике поста."""
+        post = Post.objects.create(author=self.author, text='Тестовый пост')
+        self.reader_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Тестовый комментарий'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.all().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        self.reader_client.post(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}
+        ))
+        self.assertEqual(self.counters(self.author).followers_count, 1)
+        self.assertEqual(self.counters(self.reader).following_count, 1)
+        self.reader_client.post(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}
+        ))
+        self.assertEqual(self.counters(self.author).followers_count, 0)
+        self.assertEqual(self.counters(self.reader).following_count, 0)
+
+    def test_recount_repairs_drift(self):
+        """Команда recount восстанавливает разошедшиеся счётчики."""
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Тестовый пост'
+        )
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserCounters.objects.update(
+            posts_count=10, followers_count=10, following_count=10
+        )
+        UserCounters.objects.filter(user=self.reader).delete()
+        Group.objects.update(posts_count=10)
+        Post.objects.update(comments_count=10)
+
+        call_command('recount', stdout=StringIO())
+
+        author = self.counters(self.author)
+        reader = self.counters(self.reader)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (1, 1)
+        )
+        self.assertEqual(
+            (reader.posts_count, reader.following_count), (0, 1)
+        )
+        self.group.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(post.comments_count, 1)
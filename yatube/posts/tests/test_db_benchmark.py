@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class DatabaseBenchmarkTests(SimpleTestCase):
+    def run_benchmark(self, backend):
+        out = StringIO()
+        call_command(
+            'db_benchmark', backend=[backend], posts=8, threads=2, stdout=out
+        )
+        return out.getvalue()
+
+    def test_sqlite_measured(self):
+        """Замер на SQLite проходит без ошибок записи."""
+        output = self.run_benchmark('sqlite')
+        self.assertTrue(output.startswith('sqlite: 8 постов'), output)
+        self.assertIn('ошибок 0', output)
+
+    def test_tuned_sqlite_not_locked(self):
+        """Потоки пишут и читают SQLite в режиме WAL без блокировок."""
+        output = self.run_benchmark('sqlite-tuned')
+        self.assertTrue(output.startswith('sqlite-tuned: 8 постов'), output)
+        self.assertIn('ошибок 0', output)
@@ -2,7 +2,7 @@ from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from ..models import Post, User
+from ..models import Group, Post, User
 
 MAIN_PAGE_URL = reverse('posts:index')
 
@@ -13,37 +13,76 @@ class CacheTests(TestCase):
         super().setUpClass()
         cls.page_obj = []
         cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
         cls.page_obj.append(Post.objects.create(
             author=cls.user,
+            group=cls.group,
             text='Пост для проверки кэша главной страницы'
         ))
+        cls.GROUP_PAGE_URL = reverse(
+            'posts:group_posts', kwargs={'slug': cls.group.slug}
+        )
+        cls.PROFILE_PAGE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.user.username}
+        )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
     def test_pages_uses_correct_template(self):
         """Проверка работы кэша гавной страницы index."""
-        posts_count = Post.objects.count()
         response = self.client.get(MAIN_PAGE_URL)
         content = response.content
-        # print(content.decode())
-        # print(f'ID поста = {self.page_obj[0].id}')
-        # print(f'Количество постов в базе = {posts_count}')
-        # Проверяем, что пост есть в БД
-        self.assertEqual(posts_count, 1)
-        # Удаляем пост
-        Post.objects.filter(id=1).delete()
-        # Проверяем отуствие поста в БД
-        self.assertNotEqual(posts_count, Post.objects.count())
-        # print(('Количество постов в базе после удаления поста = '
-        #       f'{Post.objects.count()}'))
-        # Проверям доступyность поста на странице из кеша
+        # Изменение в обход сигналов не видно, пока жив кэш
+        Post.objects.filter(pk=self.page_obj[0].pk).update(text='Другой')
         self.assertEqual(content, self.client.get(MAIN_PAGE_URL).content)
         # Очищаем кеш
         cache.clear()
-        # print('Cleared cache')
-        # Кэш очищен, проверяем, что на странице нет поста
+        # Кэш очищен, на странице новый текст
         self.assertNotEqual(content, self.client.get(MAIN_PAGE_URL).content)
-        # print(self.client.get(MAIN_PAGE_URL).content.decode())
+
+    def test_delete_invalidates_feeds(self):
+        """Удалённый пост сразу пропадает из всех закэшированных лент."""
+        urls = (MAIN_PAGE_URL, self.GROUP_PAGE_URL, self.PROFILE_PAGE_URL)
+        for url in urls:
+            self.assertContains(self.client.get(url), self.page_obj[0].text)
+        Post.objects.filter(pk=self.page_obj[0].pk).delete()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotContains(
+                    self.client.get(url), self.page_obj[0].text
+                )
+
+    def test_edit_invalidates_feeds(self):
+        """Правка поста сразу видна в закэшированных лентах."""
+        self.client.get(MAIN_PAGE_URL)
+        self.client.get(self.PROFILE_PAGE_URL)
+        post = Post.objects.get(pk=self.page_obj[0].pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        self.assertContains(self.client.get(MAIN_PAGE_URL), post.text)
+        self.assertContains(self.client.get(self.PROFILE_PAGE_URL), post.text)
+
+    def test_cache_hit_skips_feed_query(self):
+        """Гость получает страницу из кэша без запросов к базе."""
+        self.client.get(MAIN_PAGE_URL)
+        with self.assertNumQueries(0):
+            self.client.get(MAIN_PAGE_URL)
+
+    def test_rename_invalidates_feeds(self):
+        """Новое имя автора сразу видно в закэшированных лентах."""
+        urls = (MAIN_PAGE_URL, self.GROUP_PAGE_URL, self.PROFILE_PAGE_URL)
+        for url in urls:
+            self.client.get(url)
+        self.user.first_name = 'Переименованный'
+        self.user.save()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Переименованный')
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+MAIN_PAGE_URL = reverse('posts:index')
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PageCacheUser')
+        cls.post = Post.objects.create(author=cls.user, text='Первый пост')
+        cls.POST_DETAIL_PAGE_URL = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_hit_skips_view(self):
+        """Повторная страница гостя отдаётся без view и рендеринга."""
+        response = self.guest_client.get(MAIN_PAGE_URL)
+        with self.assertNumQueries(0):
+            cached = self.guest_client.get(MAIN_PAGE_URL)
+        self.assertIsNone(cached.context)
+        self.assertEqual(cached.content, response.content)
+
+    def test_query_string_in_key(self):
+        """Страницы с разными параметрами кэшируются отдельно."""
+        self.guest_client.get(MAIN_PAGE_URL)
+        response = self.guest_client.get(MAIN_PAGE_URL, {'page': 1})
+        self.assertIsNotNone(response.context)
+
+    def test_signals_invalidate_pages(self):
+        """Правка поста и новый комментарий сбрасывают страницы."""
+        self.guest_client.get(MAIN_PAGE_URL)
+        self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertContains(
+            self.guest_client.get(MAIN_PAGE_URL), 'Исправленный пост'
+        )
+        self.guest_client.get(self.POST_DETAIL_PAGE_URL)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Новый комментарий'
+        )
+        self.assertContains(
+            self.guest_client.get(self.POST_DETAIL_PAGE_URL),
+            'Новый комментарий',
+        )
+
+    def test_users_bypass_cache(self):
+        """Пользователь с сессией не получает гостевую страницу."""
+        self.guest_client.get(MAIN_PAGE_URL)
+        response = self.authorized_client.get(MAIN_PAGE_URL)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, f'Пользователь: {self.user.username}')
+
+    def test_cached_page_not_modified(self):
+        """Закэшированная страница отвечает 304 на свой ETag."""
+        response = self.guest_client.get(MAIN_PAGE_URL)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                MAIN_PAGE_URL, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
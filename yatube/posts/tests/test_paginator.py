@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, User
+
+MAIN_PAGE_URL = reverse('posts:index')
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CursorUser')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост {i}')
+            for i in range(1, 26)
+        )
+        # Часть постов с одинаковой датой: порядок решает id
+        now = timezone.now()
+        for number, post in enumerate(Post.objects.order_by('id')):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=number // 2)
+            )
+        cls.expected = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_walk_forward_and_back(self):
+        """Курсоры ведут по ленте без пропусков и повторов."""
+        seen = []
+        response = self.guest_client.get(MAIN_PAGE_URL)
+        page = response.context['page_obj']
+        self.assertIsNone(page.cursor.previous_cursor)
+        self.assertContains(response, f'?after={page.cursor.next_cursor}')
+        seen.extend(page.object_list)
+        while page.cursor.next_cursor:
+            response = self.guest_client.get(
+                MAIN_PAGE_URL, {'after': page.cursor.next_cursor}
+            )
+            page = response.context['page_obj']
+            seen.extend(page.object_list)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(page), 5)
+
+        response = self.guest_client.get(
+            MAIN_PAGE_URL, {'before': page.cursor.previous_cursor}
+        )
+        page = response.context['page_obj']
+        self.assertEqual(list(page), self.expected[10:20])
+        self.assertIsNotNone(page.cursor.next_cursor)
+
+    def test_cursor_page_without_count_and_offset(self):
+        """Страница по курсору не делает COUNT(*) и OFFSET."""
+        first = self.guest_client.get(MAIN_PAGE_URL).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(
+                MAIN_PAGE_URL, {'after': first.cursor.next_cursor}
+            )
+        post_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'posts_post' in query['sql']
+        ]
+        self.assertTrue(post_queries)
+        for sql in post_queries:
+            self.assertNotIn('COUNT(', sql.upper())
+            self.assertNotIn('OFFSET', sql.upper())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Неразборчивый курсор отдаёт первую страницу."""
+        response = self.guest_client.get(MAIN_PAGE_URL, {'after': '%%%'})
+        self.assertEqual(
+            list(response.context['page_obj']), self.expected[:10]
+        )
+
+    def test_page_number_compatibility(self):
+        """?page=N работает как прежде."""
+        response = self.guest_client.get(MAIN_PAGE_URL, {'page': 3})
+        page = response.context['page_obj']
+        self.assertEqual(page.number, 3)
+        self.assertEqual(page.object_list, self.expected[20:])
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+MAIN_PAGE_URL = reverse('posts:index')
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CardAuthor')
+        cls.group = Group.objects.create(
+            title='Группа карточек',
+            slug='cards-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Текст карточки',
+        )
+        cls.PROFILE_PAGE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.user.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_edit_bumps_version(self):
+        """Правка поста через post_edit меняет его версию."""
+        version = Post.objects.get(pk=self.post.pk).version
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст карточки', 'group': self.group.pk},
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.version, version + 1)
+        self.assertContains(self.client.get(MAIN_PAGE_URL), post.text)
+
+    def test_cards_read_with_one_get_many(self):
+        """Карточки страницы читаются из кэша одним get_many."""
+        with mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many:
+            self.client.get(MAIN_PAGE_URL)
+        card_calls = [
+            call for call in get_many.call_args_list
+            if call.args[0][0].startswith('post-card:')
+        ]
+        self.assertEqual(len(card_calls), 1)
+
+    def test_card_reused_after_feed_reset(self):
+        """После сброса ленты старые карточки берутся из кэша."""
+        self.client.get(MAIN_PAGE_URL)
+        # Изменение в обход сигналов версию не меняет
+        Post.objects.filter(pk=self.post.pk).update(text='В обход сигналов')
+        new_post = Post.objects.create(author=self.user, text='Другой пост')
+        response = self.client.get(MAIN_PAGE_URL)
+        self.assertContains(response, new_post.text)
+        self.assertContains(response, self.post.text)
+
+    def test_group_rename_refreshes_cards(self):
+        """Новое название группы видно в карточках."""
+        self.client.get(MAIN_PAGE_URL)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.client.get(MAIN_PAGE_URL), 'Новое название')
@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+MAIN_PAGE_URL = reverse('posts:index')
+FOLLOW_INDEX_PAGE_URL = reverse('posts:follow_index')
+
+
+class FeedQueryCountTests(TestCase):
+    """Число запросов страницы ленты не зависит от числа постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='QueryUser')
+        cls.authors = [
+            User.objects.create_user(
+                username=f'QueryAuthor{i}',
+                first_name='Имя',
+                last_name=f'Фамилия {i}',
+            )
+            for i in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Тестовая группа {i}',
+                slug=f'test-slug-{i}',
+                description='Тестовое описание',
+            )
+            for i in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+        for i in range(12):
+            Post.objects.create(
+                author=cls.authors[i % 3],
+                group=cls.groups[i % 3],
+                text=f'Тестовый пост {i}' * 10,
+            )
+        cls.GROUP_PAGE_URL = reverse(
+            'posts:group_posts', kwargs={'slug': cls.groups[0].slug}
+        )
+        cls.PROFILE_PAGE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.authors[0].username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_feed_query_counts(self):
+        """Ленты для гостя: запросы на страницу, а не на пост."""
+        pages = {
+            # посты
+            MAIN_PAGE_URL: 1,
+            # id группы для ETag, группа, посты
+            self.GROUP_PAGE_URL: 3,
+            # id автора для ETag, автор со счётчиками, посты
+            self.PROFILE_PAGE_URL: 3,
+        }
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.guest_client.get(url)
+
+    def test_authorized_feed_query_counts(self):
+        """Ленты для пользователя: плюс сессия и пользователь."""
+        pages = {
+            MAIN_PAGE_URL: 3,
+            self.GROUP_PAGE_URL: 5,
+            # плюс проверка подписки
+            self.PROFILE_PAGE_URL: 6,
+            # плюс поиск авторов, которых подмешивают при чтении
+            FOLLOW_INDEX_PAGE_URL: 4,
+        }
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.authorized_client.get(url)
+
+    def test_posts_and_page_share_rows(self):
+        """posts и page_obj в контексте — одна и та же выборка."""
+        for url in (MAIN_PAGE_URL, self.GROUP_PAGE_URL):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest_client.get(url)
+                    posts = list(response.context['posts'])
+                    page = list(response.context['page_obj'])
+                self.assertEqual(posts, page)
+                self.assertIs(
+                    response.context['posts'],
+                    response.context['page_obj'].cursor
+                )
+                post_queries = [
+                    query for query in queries.captured_queries
+                    if 'FROM "posts_post"' in query['sql']
+                    and 'MAX(' not in query['sql']
+                ]
+                self.assertEqual(len(post_queries), 1)
+
+    def test_profile_reads_text_preview(self):
+        """Профиль не читает полный текст постов."""
+        response = self.guest_client.get(self.PROFILE_PAGE_URL)
+        post = response.context['page_obj'][0]
+        self.assertIn('text', post.get_deferred_fields())
+        self.assertEqual(post.text_preview, post.text[:51])
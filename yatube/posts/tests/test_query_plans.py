@@ -0,0 +1,158 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+FULL_SCAN = r'SCAN (TABLE )?posts_(post|comment)\b(?! USING)'
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN из SQLite')
+class QueryPlanTests(TestCase):
+    """Запросы лент и комментариев читают индекс в нужном порядке.
+
+    Для каждого запроса к таблицам постов, сделанного представлением,
+    снимается EXPLAIN QUERY PLAN: в плане не должно быть сортировки во
+    временном B-дереве и полного просмотра таблицы.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PlanUser')
+        cls.author = User.objects.create_user(username='PlanAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(30)
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост с комментариями'
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(5)
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def feed_urls(self):
+        first_page = self.authorized_client.get(reverse('posts:index'))
+        cursor = first_page.context['page_obj'].cursor.next_cursor
+        return (
+            reverse('posts:index'),
+            reverse('posts:index') + f'?after={cursor}',
+            reverse('posts:index') + f'?before={cursor}',
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug})
+            + f'?after={cursor}',
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:profile', kwargs={'username': self.author})
+            + f'?after={cursor}',
+            reverse('posts:follow_index'),
+            reverse('posts:follow_index') + f'?after={cursor}',
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def test_views_use_index_order(self):
+        """Ленты и комментарии не сортируются во временном B-дереве."""
+        for url in self.feed_urls():
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.authorized_client.get(url)
+                for query in queries.captured_queries:
+                    sql = query['sql']
+                    if 'ORDER BY' not in sql or not (
+                        sql.startswith('SELECT')
+                        and ('"posts_post"' in sql
+                             or '"posts_comment"' in sql)
+                    ):
+                        continue
+                    plan = self.explain(sql)
+                    self.assertNotIn('TEMP B-TREE', plan, sql)
+                    self.assertNotRegex(plan, FULL_SCAN, sql)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_heavy_author_feed_plan(self):
+        """Лента с «тяжёлым» автором выбирает посты по двум индексам.
+
+        Посты сортируются во временном B-дереве, но в него попадают
+        только записи ленты и посты «тяжёлых» авторов, а не вся таблица.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(reverse('posts:follow_index'))
+        feed_queries = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"posts_post"' in query['sql']
+            and 'ORDER BY' in query['sql']
+        ]
+        self.assertEqual(len(feed_queries), 1)
+        plan = self.explain(feed_queries[0])
+        self.assertIn('MULTI-INDEX OR', plan)
+        self.assertIn('timeline_user_pub_date (user_id=?)', plan)
+        self.assertIn('post_author_pub_date (author_id=?)', plan)
+        self.assertNotRegex(plan, FULL_SCAN)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'индексы PostgreSQL')
+class PostgresIndexTests(TestCase):
+    """Миграции добавляют в PostgreSQL частичный и покрывающий индексы,
+    и запросы проекта ими пользуются."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='IndexAuthor')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}') for i in range(30)
+        )
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            # На маленьких таблицах планировщик выбрал бы полный просмотр.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_indexes_created(self):
+        """Индексы созданы миграциями."""
+        names = ('post_missing_manifest', 'follow_author_user')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname FROM pg_indexes WHERE indexname IN %s',
+                [names],
+            )
+            self.assertCountEqual(
+                [row[0] for row in cursor.fetchall()], names
+            )
+
+    def test_missing_manifests_use_partial_index(self):
+        """Поиск постов без манифеста читает частичный индекс."""
+        posts = Post.objects.filter(
+            image__gt='', image_manifest=''
+        ).values_list('pk', 'image')
+        self.assertIn('post_missing_manifest', self.explain(posts))
+
+    def test_followers_read_from_index(self):
+        """Подписчики автора читаются только из индекса."""
+        followers = Follow.objects.filter(
+            author=self.author
+        ).values_list('user_id', flat=True)
+        self.assertIn('Index Only Scan using follow_author_user',
+                      self.explain(followers))
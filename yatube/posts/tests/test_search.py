@@ -0,0 +1,179 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+from ..search import TABLE, search_posts
+from ..stemmer import stem
+
+SEARCH_URL = reverse('posts:search')
+
+
+class StemmerTests(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова приводятся к одной основе."""
+        forms = (
+            ('котики', 'котиков', 'котикам'),
+            ('красивая', 'красивые', 'красивого'),
+            ('новость', 'новости', 'новостями'),
+            ('подписался', 'подписались'),
+            ('ёлка', 'елки'),
+        )
+        for words in forms:
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
+
+    def test_snowball_examples(self):
+        """Основы совпадают с эталонными основами Snowball."""
+        examples = {
+            'длинный': 'длин',
+            'вкуснейший': 'вкусн',
+            'картинки': 'картинк',
+            'читающий': 'чита',
+            'django': 'django',
+        }
+        for word, expected in examples.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+
+@override_settings(POSTS_PER_PAGE=2)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='SearchAuthor')
+        cls.in_text = Post.objects.create(
+            author=cls.author, text='Смешные котики спят на диване'
+        )
+        cls.in_comment = Post.objects.create(
+            author=cls.author, text='Фото с прогулки'
+        )
+        Comment.objects.create(
+            post=cls.in_comment, author=cls.author, text='Какой котик!'
+        )
+        cls.other = Post.objects.create(
+            author=cls.author, text='Новости нашего города'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def found(self, query):
+        return list(search_posts(query).order_by('-score', '-id'))
+
+    def test_word_forms_found(self):
+        """Пост находится по другой форме слова."""
+        self.assertEqual(self.found('новостями'), [self.other])
+        self.assertEqual(self.found('городе новость'), [self.other])
+        self.assertEqual(self.found('котики город'), [])
+
+    def test_text_ranked_above_comments(self):
+        """Совпадение в тексте поста выше совпадения в комментарии."""
+        self.assertEqual(
+            self.found('котиков'), [self.in_text, self.in_comment]
+        )
+
+    def test_empty_query(self):
+        """Запрос без слов ничего не находит."""
+        self.assertEqual(self.found(' «» '), [])
+
+    def test_index_follows_changes(self):
+        """Правка поста, комментарии и удаление обновляют индекс."""
+        post = Post.objects.create(author=self.author, text='Про жирафа')
+        self.assertEqual(self.found('жираф'), [post])
+        post.text = 'Про слона'
+        post.save()
+        self.assertEqual(self.found('жираф'), [])
+        comment = Comment.objects.create(
+            post=post, author=self.author, text='Где жираф?'
+        )
+        self.assertEqual(self.found('жираф'), [post])
+        comment.delete()
+        self.assertEqual(self.found('жираф'), [])
+        Comment.objects.create(post=post, author=self.author, text='Жираф')
+        post_id = post.pk
+        post.delete()
+        self.assertEqual(self.documents(post_id), 0)
+
+    def documents(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {TABLE} WHERE post_id = %s', [post_id]
+            )
+            return cursor.fetchone()[0]
+
+    def test_comment_indexed_alone(self):
+        """Новый комментарий добавляет свою строку, не читая остальные."""
+        post = Post.objects.create(author=self.author, text='Про жирафа')
+        for number in range(3):
+            Comment.objects.create(
+                post=post, author=self.author, text=f'Жираф {number}'
+            )
+        with CaptureQueriesContext(connection) as context:
+            Comment.objects.create(
+                post=post, author=self.author, text='Где жираф?'
+            )
+        self.assertFalse([
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'posts_comment' in query['sql']
+        ])
+        self.assertEqual(self.documents(post.pk), 5)
+
+    def test_comments_add_up(self):
+        """Совпадения в нескольких комментариях поднимают пост выше."""
+        post = Post.objects.create(author=self.author, text='Фото с дачи')
+        for _ in range(3):
+            Comment.objects.create(
+                post=post, author=self.author, text='Котик!'
+            )
+        self.assertEqual(
+            self.found('котик'), [post, self.in_text, self.in_comment]
+        )
+        self.assertEqual(search_posts('котик').count(), 3)
+
+    def test_rebuild_command(self):
+        """search_index заново строит индекс по всем постам."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        self.assertEqual(self.found('новость'), [])
+        call_command('search_index', stdout=StringIO())
+        self.assertEqual(self.found('новость'), [self.other])
+
+    def test_benchmark_rolls_back(self):
+        """Бенчмарк сравнивает поиск с icontains и не оставляет постов."""
+        out = StringIO()
+        call_command('search_benchmark', posts=50, repeat=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(self.found('новость'), [self.other])
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты по курсору."""
+        Post.objects.create(author=self.author, text='Ещё котик')
+        response = self.guest_client.get(SEARCH_URL, {'q': 'котик'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(response.context['query'], 'котик')
+        self.assertEqual(len(page_obj), 2)
+        cursor = page_obj.cursor.next_cursor
+        self.assertContains(response, f'?q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA'
+                                      f'&after={cursor}')
+        response = self.guest_client.get(
+            SEARCH_URL, {'q': 'котик', 'after': cursor}
+        )
+        rest = response.context['page_obj']
+        self.assertEqual(len(rest), 1)
+        self.assertNotIn(rest[0], list(page_obj))
+
+    def test_search_page_without_query(self):
+        """Без запроса страница поиска открывается без результатов."""
+        response = self.guest_client.get(SEARCH_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 0)
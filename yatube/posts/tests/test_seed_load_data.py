@@ -0,0 +1,97 @@
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, TimelineEntry, User
+from ..search import search_posts
+from ..seeding import Plan, follow_rows, post_rows, user_rows
+
+PLAN = Plan(
+    seed=1, users=500, groups=5, posts=300, comments=200, follows=10,
+    start=0.0, end=86400.0,
+)
+
+
+class SeedingTests(TestCase):
+    def test_chunks_deterministic(self):
+        """Кусок с тем же seed генерируется одинаково, с другим — иначе."""
+        for generate in (user_rows, post_rows, follow_rows):
+            with self.subTest(generate=generate.__name__):
+                self.assertEqual(
+                    generate(PLAN, (0, 50)), generate(PLAN, (0, 50))
+                )
+                self.assertNotEqual(
+                    generate(PLAN, (0, 50)),
+                    generate(PLAN._replace(seed=2), (0, 50)),
+                )
+
+    def test_follows_power_law(self):
+        """У первых пользователей больше всего подписчиков."""
+        rows = follow_rows(PLAN, (0, PLAN.users))
+        followers = Counter(author for _, author in rows)
+        top = [author for author, _ in followers.most_common(3)]
+        self.assertLess(max(top), 10)
+        self.assertGreater(followers[0], 10 * PLAN.follows)
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertFalse(any(user == author for user, author in rows))
+
+
+class SeedLoadDataTests(TestCase):
+    def seed(self, **options):
+        out = StringIO()
+        call_command(
+            'seed_load_data', users=60, groups=3, posts=120, comments=200,
+            follows=5, stdout=out, **options,
+        )
+        return out.getvalue()
+
+    def test_loads_data(self):
+        """Данные загружаются вместе со счётчиками, лентами и индексом."""
+        output = self.seed(workers=2)
+
+        self.assertIn('Посты: 120', output)
+        self.assertIn('строк/с', output)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 120)
+        self.assertEqual(Comment.objects.count(), 200)
+        author = User.objects.order_by('pk').first()
+        self.assertEqual(
+            author.counters.posts_count, author.posts.count()
+        )
+        self.assertEqual(
+            author.counters.followers_count,
+            Follow.objects.filter(author=author).count(),
+        )
+        self.assertTrue(TimelineEntry.objects.exists())
+        text = Post.objects.order_by('pk').values_list(
+            'text', flat=True
+        ).first()
+        self.assertTrue(search_posts(text.split()[0]))
+
+    def test_same_data_for_any_workers(self):
+        """Данные зависят от seed, но не от числа процессов."""
+        self.seed(workers=1)
+        expected = list(Post.objects.order_by('pk').values_list(
+            'text', 'pub_date', 'author__username'
+        ))
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+        self.seed(workers=2)
+
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list(
+                'text', 'pub_date', 'author__username'
+            )),
+            expected,
+        )
+
+    def test_seed_loaded_twice(self):
+        """Повторная загрузка с тем же seed не дублирует данные."""
+        self.seed(workers=1, no_search=True)
+        with self.assertRaises(CommandError):
+            self.seed(workers=1, no_search=True)
@@ -0,0 +1,166 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from ..thumbnails import ready_thumbnail, refresh_post
+from ..variants import WIDTHS, source_digest, variant_name
+
+MAIN_PAGE_URL = reverse('posts:index')
+THUMBNAIL_IMG = '<img class="card-img my-2"'
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ImageAuthor')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, name):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name=name, content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюра не готова, в ленте заглушка."""
+        post = self.create_post('queued.gif')
+        self.assertIsNone(ready_thumbnail(post.image))
+        self.assertNotContains(self.client.get(MAIN_PAGE_URL), THUMBNAIL_IMG)
+        refresh_post(post.pk, post.image.name)
+        self.assertIsNotNone(ready_thumbnail(post.image))
+        self.assertContains(self.client.get(MAIN_PAGE_URL), THUMBNAIL_IMG)
+
+    def test_ready_thumbnail_is_not_refreshed(self):
+        """Готовая миниатюра не сбрасывает карточки поста ещё раз."""
+        post = self.create_post('twice.gif')
+        refresh_post(post.pk, post.image.name)
+        version = Post.objects.get(pk=post.pk).version
+        refresh_post(post.pk, post.image.name)
+        self.assertEqual(Post.objects.get(pk=post.pk).version, version)
+
+    @override_settings(THUMBNAIL_WORKERS=0)
+    def test_sync_generation(self):
+        """Без пула миниатюра создаётся при сохранении поста."""
+        post = self.create_post('sync.gif')
+        self.assertIsNotNone(ready_thumbnail(post.image))
+        self.assertContains(self.client.get(MAIN_PAGE_URL), THUMBNAIL_IMG)
+
+    def test_variants_next_to_original(self):
+        """Варианты WebP всех ширин лежат рядом с оригиналом."""
+        post = self.create_post('variants.gif')
+        refresh_post(post.pk, post.image.name)
+        for width in WIDTHS:
+            name = variant_name(
+                post.image.name, source_digest(post.image.name), width, 'WEBP'
+            )
+            with self.subTest(width=width):
+                self.assertTrue(name.startswith('posts/'))
+                with default_storage.open(name) as variant:
+                    image = Image.open(variant)
+                    self.assertEqual(image.format, 'WEBP')
+                    self.assertEqual(image.width, width)
+
+    def test_variants_of_same_stem_differ(self):
+        """У картинок с одним именем без расширения свои варианты."""
+        gif = self.create_post('same.gif')
+        buffer = BytesIO()
+        Image.new('RGB', (4, 2), 'red').save(buffer, 'PNG')
+        png = Post.objects.create(
+            author=self.user,
+            text='Пост с PNG',
+            image=SimpleUploadedFile(
+                name='same.png', content=buffer.getvalue(),
+                content_type='image/png',
+            ),
+        )
+        sources = []
+        for post in (gif, png):
+            refresh_post(post.pk, post.image.name)
+            manifest = Post.objects.get(pk=post.pk).image_manifest
+            sources.append(json.loads(manifest)['sources'])
+        self.assertNotEqual(sources[0], sources[1])
+
+    def test_srcset_in_feed(self):
+        """В ленте картинка выводится с srcset по вариантам."""
+        post = self.create_post('srcset.gif')
+        refresh_post(post.pk, post.image.name)
+        response = self.client.get(MAIN_PAGE_URL)
+        self.assertContains(response, '<source type="image/webp"')
+        self.assertContains(response, f'_{WIDTHS[0]}w.webp {WIDTHS[0]}w')
+
+    def test_manifest_written_by_task(self):
+        """Задача записывает в пост манифест готовых картинок."""
+        post = self.create_post('manifest.gif')
+        self.assertEqual(post.image_manifest, '')
+        refresh_post(post.pk, post.image.name)
+        manifest = json.loads(Post.objects.get(pk=post.pk).image_manifest)
+        self.assertEqual(manifest['src'], ready_thumbnail(post.image).name)
+        self.assertEqual((manifest['width'], manifest['height']), (960, 339))
+        self.assertEqual(
+            [width for width, name in manifest['sources'][-1]['srcset']],
+            list(WIDTHS),
+        )
+
+    def test_feed_renders_without_lookups(self):
+        """Лента выводит картинки без хранилища ключей sorl и файлов."""
+        post = self.create_post('lookups.gif')
+        refresh_post(post.pk, post.image.name)
+        with mock.patch(
+            'sorl.thumbnail.default.kvstore.get', side_effect=AssertionError
+        ), mock.patch.object(
+            default_storage, 'exists', side_effect=AssertionError
+        ):
+            response = self.client.get(MAIN_PAGE_URL)
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_new_image_resets_manifest(self):
+        """Замена картинки сбрасывает манифест прежней."""
+        post = self.create_post('old.gif')
+        refresh_post(post.pk, post.image.name)
+        post = Post.objects.get(pk=post.pk)
+        post.image = SimpleUploadedFile(
+            name='new.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        post.save()
+        self.assertEqual(Post.objects.get(pk=post.pk).image_manifest, '')
+
+    def test_image_manifests_command(self):
+        """Команда создаёт манифесты постов без них."""
+        post = self.create_post('command.gif')
+        call_command('image_manifests', stdout=mock.Mock())
+        self.assertNotEqual(Post.objects.get(pk=post.pk).image_manifest, '')
@@ -0,0 +1,125 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+
+FOLLOW_INDEX_PAGE_URL = reverse('posts:follow_index')
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TimelineAuthor')
+        cls.follower = User.objects.create_user(username='TimelineFollower')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост до подписки'
+        )
+        cls.FOLLOW_PAGE_URL = reverse(
+            'posts:profile_follow', kwargs={'username': cls.author.username}
+        )
+        cls.UNFOLLOW_PAGE_URL = reverse(
+            'posts:profile_unfollow', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.follower)
+
+    def timeline_posts(self):
+        return set(TimelineEntry.objects.filter(
+            user=self.follower
+        ).values_list('post_id', flat=True))
+
+    def test_follow_backfills_timeline(self):
+        """Подписка заносит в ленту уже опубликованные посты автора."""
+        self.authorized_client.post(self.FOLLOW_PAGE_URL)
+        self.assertEqual(self.timeline_posts(), {self.old_post.pk})
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIn(post.pk, self.timeline_posts())
+        response = self.authorized_client.get(FOLLOW_INDEX_PAGE_URL)
+        self.assertEqual(
+            list(response.context['page_obj']), [post, self.old_post]
+        )
+
+    def test_unfollow_prunes_timeline(self):
+        """Отписка убирает посты автора из ленты."""
+        self.authorized_client.post(self.FOLLOW_PAGE_URL)
+        self.authorized_client.post(self.UNFOLLOW_PAGE_URL)
+        self.assertEqual(self.timeline_posts(), set())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_heavy_author_read_fallback(self):
+        """Посты популярного автора подмешиваются в ленту при чтении."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.timeline_posts(), set())
+        response = self.authorized_client.get(FOLLOW_INDEX_PAGE_URL)
+        self.assertEqual(
+            list(response.context['page_obj']), [post, self.old_post]
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, POSTS_PER_PAGE=2)
+    def test_heavy_author_feed_pages(self):
+        """Лента с «тяжёлым» автором листается без пропусков и повторов."""
+        light = User.objects.create_user(username='LightAuthor')
+        other = User.objects.create_user(username='OtherFollower')
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        Follow.objects.create(user=self.follower, author=light)
+        posts = [self.old_post]
+        for number in range(3):
+            posts.append(Post.objects.create(
+                author=self.author, text=f'Тяжёлый {number}'
+            ))
+            posts.append(Post.objects.create(
+                author=light, text=f'Лёгкий {number}'
+            ))
+        shown = []
+        params = {}
+        while True:
+            response = self.authorized_client.get(
+                FOLLOW_INDEX_PAGE_URL, params
+            )
+            page_obj = response.context['page_obj']
+            shown.extend(page_obj)
+            if not page_obj.cursor.next_cursor:
+                break
+            params = {'after': page_obj.cursor.next_cursor}
+        self.assertEqual(shown, posts[::-1])
+
+    def make_light_again(self):
+        other = User.objects.create_user(username='OtherFollower')
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertNotIn(post.pk, self.timeline_posts())
+        Follow.objects.filter(user=other).delete()
+        return post
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, TIMELINE_WORKERS=0)
+    def test_author_becomes_light_again(self):
+        """Автор перестал быть популярным: его посты раскладываются."""
+        post = self.make_light_again()
+        self.assertEqual(self.timeline_posts(), {self.old_post.pk, post.pk})
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, TIMELINE_WORKERS=1)
+    def test_light_again_backfilled_after_commit(self):
+        """Раскладка по лентам подписчиков идёт не в запросе отписки."""
+        self.make_light_again()
+        # Тест идёт в транзакции, и задача после коммита не запускалась.
+        self.assertEqual(self.timeline_posts(), {self.old_post.pk})
+
+    @override_settings(TIMELINE_BACKFILL_SIZE=1)
+    def test_backfill_limited(self):
+        """При подписке в ленту попадают только последние посты автора."""
+        newer = Post.objects.create(author=self.author, text='Пост новее')
+        self.authorized_client.post(self.FOLLOW_PAGE_URL)
+        self.assertEqual(self.timeline_posts(), {newer.pk})
+        response = self.authorized_client.get(FOLLOW_INDEX_PAGE_URL)
+        self.assertEqual(list(response.context['page_obj']), [newer])
@@ -0,0 +1,219 @@
+import datetime as dt
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import (Comment, Follow, Group, Post, TimelineEntry, User,
+                      UserCounters)
+from ..search import search_posts
+
+OLD_DATE = timezone.make_aware(dt.datetime(2020, 5, 17, 12, 30))
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TransferAuthor')
+        cls.commentator = User.objects.create_user(
+            username='TransferCommentator'
+        )
+        cls.follower = User.objects.create_user(username='TransferFollower')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Переезд', slug='transfer', description='Описание'
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write_lines(self, name, records):
+        path = self.path(name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            for record in records:
+                stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return path
+
+    def import_posts(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def make_posts(self):
+        first = Post.objects.create(
+            author=self.author, group=self.group, text='Первый пост о котиках'
+        )
+        Post.objects.create(author=self.author, text='Второй пост')
+        Comment.objects.create(
+            post=first, author=self.commentator, text='Комментарий'
+        )
+        Post.objects.filter(pk=first.pk).update(pub_date=OLD_DATE)
+        Comment.objects.update(created=OLD_DATE)
+
+    def snapshot(self):
+        posts = Post.objects.order_by('pk').values_list(
+            'text', 'pub_date', 'author__username', 'group__slug',
+            'comments_count',
+        )
+        comments = Comment.objects.order_by('pk').values_list(
+            'post__text', 'text', 'created', 'author__username'
+        )
+        return list(posts), list(comments)
+
+    def assert_round_trip(self, name):
+        self.make_posts()
+        expected = self.snapshot()
+        path = self.path(name)
+        out = StringIO()
+        call_command('export_posts', path, stdout=out)
+        self.assertIn('Выгружено записей: 3', out.getvalue())
+        Post.objects.all().delete()
+
+        output, _ = self.import_posts(path)
+
+        self.assertIn('Загружено постов: 2, комментариев: 1', output)
+        self.assertIn('строк/с', output)
+        self.assertEqual(self.snapshot(), expected)
+        return output
+
+    def test_ndjson_round_trip(self):
+        """Посты и комментарии переносятся через NDJSON с датами."""
+        self.assert_round_trip('posts.ndjson')
+
+    def test_csv_round_trip(self):
+        """Формат CSV выбирается по расширению файла."""
+        self.assert_round_trip('posts.csv')
+        with open(self.path('posts.csv'), encoding='utf-8') as stream:
+            self.assertTrue(stream.readline().startswith('kind,text,date'))
+
+    def test_import_updates_derived_data(self):
+        """Импорт обновляет счётчики, ленту подписчиков и поиск."""
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Новости про котиков',
+             'author': self.author.username, 'group': self.group.slug},
+            {'kind': 'post', 'text': 'Ещё пост',
+             'author': self.author.username},
+        ])
+
+        self.import_posts(path)
+
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).posts_count, 2
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.follower).count(), 2
+        )
+        self.assertEqual(
+            list(search_posts('котики').values_list('text', flat=True)),
+            ['Новости про котиков'],
+        )
+
+    def test_small_batches(self):
+        """Комментарии попадают к своим постам при пакетах из одной записи."""
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Пост 1', 'author': self.author.username},
+            {'kind': 'comment', 'text': 'К посту 1',
+             'author': self.commentator.username},
+            {'kind': 'post', 'text': 'Пост 2', 'author': self.author.username},
+            {'kind': 'comment', 'text': 'К посту 2',
+             'author': self.commentator.username},
+        ])
+
+        self.import_posts(path, batch_size=1)
+
+        self.assertEqual(
+            list(Comment.objects.order_by('pk').values_list(
+                'post__text', 'text'
+            )),
+            [('Пост 1', 'К посту 1'), ('Пост 2', 'К посту 2')],
+        )
+
+    def test_dates_kept_after_deleted_rows(self):
+        """Даты и комментарии попадают к новым постам после удалённых."""
+        Post.objects.create(author=self.author, text='Удалённый').delete()
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Старый пост',
+             'date': OLD_DATE.isoformat(), 'author': self.author.username},
+            {'kind': 'comment', 'text': 'Старый комментарий',
+             'date': OLD_DATE.isoformat(),
+             'author': self.commentator.username},
+        ])
+
+        self.import_posts(path)
+
+        post = Post.objects.get()
+        self.assertEqual(post.pub_date, OLD_DATE)
+        self.assertEqual(
+            list(post.comments.values_list('text', 'created')),
+            [('Старый комментарий', OLD_DATE)],
+        )
+        self.assertGreater(
+            Post.objects.create(author=self.author, text='Новый').pub_date,
+            OLD_DATE,
+        )
+
+    def test_dates_written_by_insert(self):
+        """Даты пишутся при вставке, без второго прохода UPDATE по строкам."""
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Старый пост',
+             'date': OLD_DATE.isoformat(), 'author': self.author.username},
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.import_posts(path)
+
+        self.assertEqual(Post.objects.get().pub_date, OLD_DATE)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if 'UPDATE "posts_post" SET "pub_date"' in query['sql']
+        ])
+
+    def test_invalid_records_skipped(self):
+        """Пост с неизвестным автором пропускается вместе с комментариями."""
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Чужой', 'author': 'nobody'},
+            {'kind': 'comment', 'text': 'К чужому',
+             'author': self.commentator.username},
+            {'kind': 'post', 'text': 'В группе',
+             'author': self.author.username, 'group': 'missing'},
+            {'kind': 'post', 'text': 'Свой', 'author': self.author.username},
+            {'kind': 'comment', 'text': 'Без автора', 'author': 'nobody'},
+        ])
+
+        output, errors = self.import_posts(path)
+
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Свой']
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertIn('пропущено записей: 4', output)
+        self.assertIn('строка 1: нет пользователя «nobody»', errors)
+        self.assertIn('строка 3: нет группы «missing»', errors)
+
+    def test_dry_run_writes_nothing(self):
+        """Пробный запуск проверяет файл, но ничего не записывает."""
+        path = self.write_lines('posts.ndjson', [
+            {'kind': 'post', 'text': 'Пост', 'author': self.author.username},
+            {'kind': 'comment', 'text': 'Комментарий',
+             'author': self.commentator.username},
+        ])
+
+        output, _ = self.import_posts(path, dry_run=True)
+
+        self.assertIn('Проверено постов: 1, комментариев: 1', output)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
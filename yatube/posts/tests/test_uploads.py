@@ -0,0 +1,155 @@
+import shutil
+import tempfile
+import tracemalloc
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..forms import PostForm
+from ..models import Post, User
+from ..thumbnails import refresh_post
+from ..uploads import normalize_original
+
+POST_CREATE_PAGE_URL = reverse('posts:post_create')
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+PILLOW_BLOCK_SIZE = 64 * 1024
+
+
+def image_bytes(size, image_format='PNG', **options):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class UploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Uploader')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def measure_peak(self, name, content):
+        """Пик памяти при разборе загрузки и проверке формы."""
+        request = RequestFactory().post(POST_CREATE_PAGE_URL, data={
+            'text': 'Пост с большой картинкой',
+            'image': SimpleUploadedFile(name, content),
+        })
+        tracemalloc.start()
+        try:
+            form = PostForm(request.POST, request.FILES)
+            form.is_valid()
+            return form, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def measure_decoded(self, func, *args):
+        """Сколько памяти Pillow выделил под пиксели, пока работала func.
+
+        tracemalloc этих выделений не видит: Pillow берёт память блоками
+        мимо аллокатора Python. Блоки считаются все, а не только
+        одновременно занятые, так что это оценка пика сверху.
+        """
+        block_size = Image.core.get_block_size()
+        Image.core.set_block_size(PILLOW_BLOCK_SIZE)
+        Image.core.reset_stats()
+        try:
+            func(*args)
+            return Image.core.get_stats()['allocated_blocks'] * (
+                PILLOW_BLOCK_SIZE
+            )
+        finally:
+            Image.core.set_block_size(block_size)
+
+    @override_settings(POST_IMAGE_MAX_BYTES=256 * 1024)
+    def test_oversized_file_is_not_buffered(self):
+        """Файл больше лимита не копится в памяти."""
+        form, peak = self.measure_peak('big.png', b'\0' * 2 * 1024 * 1024)
+        self.assertTrue(form.has_error('image', 'file_too_large'))
+        # Pillow файл не открывал: других ошибок у поля нет.
+        self.assertEqual(len(form.errors['image']), 1)
+        self.assertLess(peak, 1024 * 1024)
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=1_000_000)
+    def test_pixel_limit_checked_before_decode(self):
+        """Картинка с лишними пикселями отклоняется по заголовку."""
+        form, peak = self.measure_peak('huge.png', image_bytes((5000, 5000)))
+        self.assertTrue(form.has_error('image', 'too_many_pixels'))
+        # Декодированная картинка заняла бы 75 МБ
+        self.assertLess(peak, 5 * 1024 * 1024)
+
+    @override_settings(POST_IMAGE_MAX_DECODED_PIXELS=1_000_000)
+    def test_decoded_pixel_limit(self):
+        """Для PNG лимит пикселей меньше, чем для JPEG того же размера."""
+        form, _ = self.measure_peak('wide.png', image_bytes((2000, 1000)))
+        self.assertTrue(form.has_error('image', 'too_many_pixels'))
+        form, _ = self.measure_peak(
+            'wide.jpg', image_bytes((2000, 1000), 'JPEG')
+        )
+        self.assertNotIn('image', form.errors)
+
+    @override_settings(
+        POST_IMAGE_MAX_DECODED_PIXELS=1_000_000, POST_IMAGE_MAX_SIDE=100
+    )
+    def test_normalization_memory_bounded(self):
+        """Фоновая задача декодирует PNG не больше лимита пикселей."""
+        allowed = default_storage.save(
+            'allowed.png', ContentFile(image_bytes((1000, 1000)))
+        )
+        oversized = default_storage.save(
+            'oversized.png', ContentFile(image_bytes((2000, 2000)))
+        )
+        decoded = self.measure_decoded(
+            normalize_original, default_storage, allowed
+        )
+        # Картинка в миллион пикселей по 4 байта, её копия после поворота
+        # по EXIF и уменьшенная копия
+        self.assertLess(decoded, 3 * 4 * 1_000_000)
+
+        def normalize_oversized():
+            with self.assertRaises(ValueError):
+                normalize_original(default_storage, oversized)
+
+        # Декодированная картинка заняла бы 16 МБ
+        self.assertLess(
+            self.measure_decoded(normalize_oversized), 1024 * 1024
+        )
+
+    def test_valid_upload_creates_post(self):
+        """Картинка в пределах лимитов сохраняется с постом."""
+        self.client.force_login(self.user)
+        self.client.post(POST_CREATE_PAGE_URL, data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile('ok.png', image_bytes((40, 30))),
+        })
+        self.assertTrue(Post.objects.get().image)
+
+    @override_settings(POST_IMAGE_MAX_SIDE=100)
+    def test_original_normalized_in_background(self):
+        """Фоновая задача уменьшает оригинал и убирает EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        post = Post(author=self.user, text='Пост с EXIF')
+        post.image.save(
+            'exif.jpg',
+            SimpleUploadedFile(
+                'exif.jpg', image_bytes((400, 200), 'JPEG', exif=exif)
+            ),
+            save=False,
+        )
+        refresh_post(None, post.image.name)
+        with default_storage.open(post.image.name) as original:
+            image = Image.open(original)
+            self.assertEqual(image.size, (100, 50))
+            self.assertNotIn('exif', image.info)
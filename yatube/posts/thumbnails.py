@@ -0,0 +1,149 @@
+"""Фоновая генерация миниатюр картинок постов.
+
+Миниатюры и адаптивные варианты (см. variants) создаются не в запросе,
+который первым показал пост, а в пуле потоков после сохранения поста.
+Имена и размеры готовых картинок записываются в Post.image_manifest,
+и шаблоны берут их оттуда без обращений к хранилищу ключей sorl и к
+файлам. Пока манифеста нет, шаблоны выводят заглушку; когда он записан,
+версия поста и поколения его лент увеличиваются, чтобы закэшированные
+карточки отрисовались заново. При THUMBNAIL_WORKERS = 0 картинки
+создаются сразу при сохранении.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from .cache import bump_generation, post_scopes
+from .models import Post
+from .uploads import normalize_original
+from .variants import make_variants, ready_sources
+
+logger = logging.getLogger(__name__)
+
+WIDTH, HEIGHT = 960, 339
+GEOMETRY = f'{WIDTH}x{HEIGHT}'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+_executor = None
+
+
+class Thumbnails(ThumbnailBackend):
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Миниатюра из хранилища ключей sorl или None, без генерации.
+
+        Параметры дополняются так же, как в get_thumbnail, чтобы имя
+        миниатюры совпало с тем, под которым её сохранит генерация.
+        """
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = Thumbnails()
+
+
+def ready_thumbnail(image):
+    if not image:
+        return None
+    return backend.get_ready_thumbnail(image, GEOMETRY, **OPTIONS)
+
+
+def make_thumbnail(name):
+    if ready_thumbnail(name) is None:
+        backend.get_thumbnail(name, GEOMETRY, **OPTIONS)
+
+
+def make_images(name):
+    """Готовит оригинал и создаёт недостающие миниатюру и варианты."""
+    try:
+        normalize_original(default.storage, name)
+        make_thumbnail(name)
+        make_variants(name)
+    except Exception:
+        logger.exception('Не удалось создать картинки для %s', name)
+
+
+def build_manifest(name):
+    """JSON с готовыми картинками для шаблонов; пустой без миниатюры."""
+    thumbnail = ready_thumbnail(name)
+    if thumbnail is None:
+        return ''
+    return json.dumps({
+        'src': thumbnail.name,
+        'width': WIDTH,
+        'height': HEIGHT,
+        'sources': [
+            {'type': mime_type, 'srcset': variants}
+            for mime_type, variants in ready_sources(name)
+        ],
+    }, separators=(',', ':'))
+
+
+def refresh_post(post_id, name):
+    """Создаёт картинки поста и сбрасывает его закэшированные карточки."""
+    make_images(name)
+    manifest = build_manifest(name)
+    if not manifest:
+        return
+    # Картинку поста могли заменить, пока шла задача.
+    posts = Post.objects.filter(pk=post_id, image=name).exclude(
+        image_manifest=manifest
+    )
+    post = posts.only('author_id', 'group_id').first()
+    if post is None:
+        return
+    posts.update(image_manifest=manifest, version=F('version') + 1)
+    bump_generation(*post_scopes(post))
+
+
+def run_task(post_id, name):
+    try:
+        refresh_post(post_id, name)
+    finally:
+        # Соединения потоков пула сами не закрываются.
+        connection.close()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def schedule(post):
+    """Ставит в очередь миниатюру и варианты картинки поста."""
+    if not post.image:
+        return
+    name = post.image.name
+    if not settings.THUMBNAIL_WORKERS:
+        # Картинки готовы раньше, чем отрисуются карточки новой версии.
+        make_images(name)
+        post.image_manifest = build_manifest(name)
+        Post.objects.filter(pk=post.pk).update(
+            image_manifest=post.image_manifest
+        )
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(run_task, post.pk, name)
+    )
@@ -0,0 +1,189 @@
+"""Материализованная лента подписок.
+
+Посты обычных авторов раскладываются по лентам подписчиков при
+публикации (fan-out on write). У авторов, на которых подписано больше
+TIMELINE_FANOUT_LIMIT человек, раскладка слишком дорогая, поэтому их
+посты подмешиваются в ленту при чтении (fan-out on read).
+
+При подписке в ленту заносятся только TIMELINE_BACKFILL_SIZE последних
+постов автора: более старые посты в ленте подписок не появятся, они
+видны на странице автора. Когда автор перестаёт быть «тяжёлым», его
+посты раскладываются по лентам всех подписчиков в пуле потоков после
+коммита, а не в запросе отписки.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .cache import bump_generation, follow_scope
+from .models import Follow, Post, TimelineEntry, UserCounters
+
+BATCH_SIZE = 500
+
+_executor = None
+
+
+def followers_count(author_id):
+    return UserCounters.objects.filter(pk=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+
+
+def is_heavy(count):
+    return count > settings.TIMELINE_FANOUT_LIMIT
+
+
+def fan_out_post(post):
+    """Добавляет пост в ленты подписчиков автора."""
+    fan_out_posts([post])
+
+
+def fan_out_posts(posts):
+    """Добавляет посты в ленты подписчиков, по запросу на автора."""
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post.author_id].append(post)
+    for author_id, author_posts in by_author.items():
+        if is_heavy(followers_count(author_id)):
+            continue
+        # Подписчиков не больше TIMELINE_FANOUT_LIMIT.
+        follower_ids = list(Follow.objects.filter(
+            author=author_id
+        ).values_list('user_id', flat=True))
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(
+                    user_id=user_id,
+                    post=post,
+                    author_id=author_id,
+                    pub_date=post.pub_date,
+                )
+                for post in author_posts
+                for user_id in follower_ids
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def recent_posts(author_id):
+    return Post.objects.filter(author=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.TIMELINE_BACKFILL_SIZE]
+
+
+def add_entries(user_ids, author_id, posts):
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for user_id in user_ids
+            for post_id, pub_date in posts
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    """Заносит в ленту подписчика последние посты автора."""
+    if is_heavy(followers_count(author_id)):
+        return
+    add_entries([user_id], author_id, recent_posts(author_id))
+
+
+def backfill_followers(author_id):
+    """Заносит последние посты автора в ленты всех его подписчиков.
+
+    Посты читаются один раз, подписчики — пакетами, и у каждого пакета
+    сбрасываются закэшированные ленты подписок.
+    """
+    if is_heavy(followers_count(author_id)):
+        return
+    posts = list(recent_posts(author_id))
+    follower_ids = Follow.objects.filter(author=author_id).order_by(
+        'user_id'
+    ).values_list('user_id', flat=True)
+    batch = []
+    for user_id in follower_ids.iterator():
+        batch.append(user_id)
+        if len(batch) == BATCH_SIZE:
+            add_entries(batch, author_id, posts)
+            bump_generation(*map(follow_scope, batch))
+            batch = []
+    if batch:
+        add_entries(batch, author_id, posts)
+        bump_generation(*map(follow_scope, batch))
+
+
+def run_backfill(author_id):
+    try:
+        backfill_followers(author_id)
+    finally:
+        # Соединения потоков пула сами не закрываются.
+        connection.close()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.TIMELINE_WORKERS,
+            thread_name_prefix='timeline',
+        )
+    return _executor
+
+
+def schedule_backfill(author_id):
+    """Ставит в очередь раскладку постов автора по лентам подписчиков.
+
+    Пока задача не выполнена, старых постов автора в лентах нет: при
+    чтении они уже не подмешиваются.
+    """
+    if not settings.TIMELINE_WORKERS:
+        backfill_followers(author_id)
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(run_backfill, author_id)
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты подписчика посты автора."""
+    TimelineEntry.objects.filter(user=user_id, author=author_id).delete()
+
+
+# Ключ курсорной пагинации ленты подписок.
+FEED_KEYS = ('feed_date', 'feed_id')
+
+
+def follow_feed(user):
+    """Посты ленты подписок: материализованные и подмешанные при чтении.
+
+    Пока среди авторов нет «тяжёлых», лента читается по индексу
+    записей ленты и сортируется по их полям. Иначе посты объединяются
+    условием и сортируются по полям самих постов: каждая часть условия
+    читается по своему индексу, а во временном B-дереве сортируются
+    только записи ленты и посты «тяжёлых» авторов (план проверяет
+    test_query_plans).
+    """
+    heavy_authors = list(Follow.objects.filter(
+        user=user,
+        author__counters__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('author_id', flat=True))
+    if not heavy_authors:
+        return Post.objects.filter(timeline_entries__user=user).annotate(
+            feed_date=F('timeline_entries__pub_date'),
+            feed_id=F('timeline_entries__post_id'),
+        )
+    return Post.objects.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post_id'))
+        | Q(author_id__in=heavy_authors)
+    ).annotate(feed_date=F('pub_date'), feed_id=F('id'))
@@ -0,0 +1,386 @@
+"""Перенос постов и комментариев между окружениями.
+
+Файл — поток записей в формате NDJSON (объект JSON на строку) или CSV с
+полями FIELDS. Запись kind=post — пост, за ним идут записи kind=comment
+с его комментариями. Автор указывается именем пользователя, группа —
+слагом, дата — в ISO 8601 и при импорте сохраняется: посты и
+комментарии вставляются без auto_now_add (см. create_keeping_dates).
+
+Импорт читает файл пакетами и пишет каждый пакет пакетными INSERT в
+своей транзакции, поэтому память не растёт с размером файла. Сигналы
+при такой вставке не срабатывают, и то, что делают обработчики из
+posts.signals (счётчики, лента подписок, поисковый индекс, поколения
+кэша), импорт делает сам — одним запросом на пакет, а не на пост.
+"""
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, timeline
+from .cache import ALL, author_scope, bump_generation, group_scope
+from .models import Comment, Group, Post, User
+
+FORMATS = ('ndjson', 'csv')
+FIELDS = ('kind', 'text', 'date', 'author', 'group', 'image')
+POST, COMMENT = 'post', 'comment'
+BATCH_SIZE = 1000
+# Сколько сообщений об ошибках хранить; остальные только считаются.
+MAX_ERRORS = 20
+
+
+class TransferError(ValueError):
+    """Запись файла, которую нельзя импортировать."""
+
+
+def guess_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def read_records(stream, format):
+    """Записи файла по одной: (номер строки, словарь полей)."""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_num, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            record = {'kind': None}
+        yield line_num, record
+
+
+class RecordWriter:
+    def __init__(self, stream, format):
+        self.stream = stream
+        self.format = format
+        if format == 'csv':
+            self.writer = csv.DictWriter(stream, FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        if self.format == 'csv':
+            self.writer.writerow(record)
+        else:
+            # Пустые поля комментария не нужны в NDJSON.
+            record = {key: value for key, value in record.items() if value}
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def post_record(text, date, author, group, image):
+    return {
+        'kind': POST,
+        'text': text,
+        'date': date.isoformat(),
+        'author': author,
+        'group': group or '',
+        'image': image or '',
+    }
+
+
+def comment_record(text, date, author):
+    return {
+        'kind': COMMENT,
+        'text': text,
+        'date': date.isoformat(),
+        'author': author,
+        'group': '',
+        'image': '',
+    }
+
+
+def export_posts(stream, format, batch_size=BATCH_SIZE):
+    """Пишет посты с комментариями; возвращает число записей.
+
+    Посты читаются пакетами по первичному ключу, комментарии — одним
+    запросом на пакет.
+    """
+    writer = RecordWriter(stream, format)
+    posts = Post.objects.order_by('pk').values_list(
+        'pk', 'text', 'pub_date', 'author__username', 'group__slug', 'image'
+    )
+    written = 0
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return written
+        last_pk = batch[-1][0]
+        comments = defaultdict(list)
+        rows = Comment.objects.filter(
+            post__in=[row[0] for row in batch]
+        ).order_by('post_id', 'created', 'pk').values_list(
+            'post_id', 'text', 'created', 'author__username'
+        )
+        for post_id, *comment in rows:
+            comments[post_id].append(comment)
+        for pk, *post in batch:
+            writer.write(post_record(*post))
+            for comment in comments[pk]:
+                writer.write(comment_record(*comment))
+            written += 1 + len(comments[pk])
+
+
+def max_pk(model):
+    return model.objects.aggregate(top=Max('pk'))['top'] or 0
+
+
+def create_keeping_dates(model, objects, batch_size=None):
+    """bulk_create, который оставляет в полях auto_now_add даты объектов.
+
+    bulk_create ставит в эти поля текущее время, поэтому пакеты
+    вставляются INSERT с raw=True, как при загрузке фикстур: он пишет
+    значения полей как есть, без pre_save. Ключи, которых SQLite не
+    возвращает, объекты получают после вставки. Объекты — либо все с
+    ключами, либо все без них. Вызывается в транзакции.
+    """
+    if not objects:
+        return
+    has_pk = objects[0].pk is not None
+    fields = [
+        field for field in model._meta.concrete_fields
+        if has_pk or field is not model._meta.auto_field
+    ]
+    returns_ids = not has_pk and (
+        connection.features.can_return_ids_from_bulk_insert
+    )
+    last = None if has_pk or returns_ids else max_pk(model)
+    batch_size = batch_size or max(
+        connection.ops.bulk_batch_size(fields, objects), 1
+    )
+    for start in range(0, len(objects), batch_size):
+        batch = objects[start:start + batch_size]
+        ids = model._base_manager._insert(
+            batch, fields=fields, return_id=returns_ids, raw=True
+        )
+        if not returns_ids:
+            continue
+        # Для одной строки PostgreSQL возвращает ключ, а не список.
+        if not isinstance(ids, list):
+            ids = [ids]
+        for obj, pk in zip(batch, ids):
+            obj.pk = pk
+    if last is not None:
+        recover_pks(model, objects, last)
+    for obj in objects:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+
+
+def recover_pks(model, objects, last):
+    """Ключи строк, которые SQLite не вернул при вставке.
+
+    Новые строки — ключи больше last, прочитанного в той же транзакции
+    до вставки: в SQLite пишет один процесс, а чужая запись между
+    чтением и вставкой прервала бы транзакцию. Ключи AUTOINCREMENT
+    растут в порядке вставки.
+    """
+    pks = list(model.objects.filter(pk__gt=last).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+    if len(pks) != len(objects):
+        raise DatabaseError(
+            f'вставлено строк {len(objects)}, новых ключей {len(pks)}'
+        )
+    for obj, pk in zip(objects, pks):
+        obj.pk = pk
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise TransferError(f'неверная дата «{value}»')
+    if settings.USE_TZ and timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+class Importer:
+    """Импорт записей пакетами; при dry_run только проверяет их.
+
+    Группы читаются в словарь один раз, пользователи — одним запросом на
+    пакет для имён, которых ещё нет в словаре.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.users = {}
+        self.posts = 0
+        self.comments = 0
+        self.images = 0
+        self.skipped = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows(self):
+        return self.posts + self.comments
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def run(self, records):
+        start = time.perf_counter()
+        batch = []
+        batch_rows = 0
+        for line_num, record in records:
+            kind = record.get('kind')
+            if kind == POST:
+                if batch_rows >= self.batch_size:
+                    self.import_batch(batch)
+                    batch, batch_rows = [], 0
+                batch.append((line_num, record, []))
+            elif kind == COMMENT and batch:
+                batch[-1][2].append((line_num, record))
+            elif kind == COMMENT:
+                self.skip(line_num, 'комментарий без поста')
+                continue
+            else:
+                self.skip(line_num, f'неизвестный тип записи «{kind}»')
+                continue
+            batch_rows += 1
+        self.import_batch(batch)
+        self.seconds = time.perf_counter() - start
+
+    def skip(self, line_num, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f'строка {line_num}: {message}')
+
+    def load_users(self, batch):
+        names = {
+            record.get('author')
+            for _, post, comments in batch
+            for record in (post, *(comment for _, comment in comments))
+        } - set(self.users)
+        self.users.update(dict.fromkeys(names))
+        self.users.update(
+            User.objects.filter(username__in=names).values_list(
+                'username', 'pk'
+            )
+        )
+
+    def author_id(self, record):
+        author_id = self.users.get(record.get('author'))
+        if author_id is None:
+            raise TransferError(
+                f'нет пользователя «{record.get("author")}»'
+            )
+        return author_id
+
+    def group_id(self, record):
+        slug = record.get('group')
+        if not slug:
+            return None
+        if slug not in self.groups:
+            raise TransferError(f'нет группы «{slug}»')
+        return self.groups[slug]
+
+    def build_post(self, record):
+        if not record.get('text'):
+            raise TransferError('пустой текст')
+        return Post(
+            text=record['text'],
+            pub_date=parse_date(record.get('date')),
+            author_id=self.author_id(record),
+            group_id=self.group_id(record),
+            image=record.get('image') or '',
+        )
+
+    def build_comment(self, record):
+        if not record.get('text'):
+            raise TransferError('пустой текст')
+        return Comment(
+            text=record['text'],
+            created=parse_date(record.get('date')),
+            author_id=self.author_id(record),
+        )
+
+    def build(self, batch):
+        """Модели пакета: [(пост, [комментарии])]; ошибки пропускаются.
+
+        Вместе с неверным постом пропускаются его комментарии.
+        """
+        built = []
+        for line_num, record, comment_records in batch:
+            try:
+                post = self.build_post(record)
+            except TransferError as error:
+                self.skip(line_num, error)
+                self.skipped += len(comment_records)
+                continue
+            comments = []
+            for comment_line, comment_record in comment_records:
+                try:
+                    comments.append(self.build_comment(comment_record))
+                except TransferError as error:
+                    self.skip(comment_line, error)
+            post.comments_count = len(comments)
+            built.append((post, comments))
+        return built
+
+    def import_batch(self, batch):
+        if not batch:
+            return
+        self.load_users(batch)
+        built = self.build(batch)
+        if not built:
+            return
+        posts = [post for post, _ in built]
+        comments = sum((comments for _, comments in built), [])
+        if not self.dry_run:
+            with transaction.atomic():
+                self.save(built, posts)
+            bump_generation(ALL, *{
+                scope
+                for post in posts
+                for scope in (
+                    author_scope(post.author_id),
+                    post.group_id and group_scope(post.group_id),
+                )
+                if scope
+            })
+        self.posts += len(posts)
+        self.comments += len(comments)
+        self.images += sum(1 for post in posts if post.image)
+
+    def save(self, built, posts):
+        create_keeping_dates(Post, posts, self.batch_size)
+        comments = []
+        for post, post_comments in built:
+            for comment in post_comments:
+                comment.post_id = post.pk
+                comments.append(comment)
+        create_keeping_dates(Comment, comments, self.batch_size)
+
+        for author_id, count in Counter(
+            post.author_id for post in posts
+        ).items():
+            counters.bump_user(author_id, posts_count=count)
+        for group_id, count in Counter(
+            post.group_id for post in posts
+        ).items():
+            counters.bump(Group, group_id, posts_count=count)
+        timeline.fan_out_posts(posts)
+        search.write_posts((post.pk, post.text) for post in posts)
+        search.write_comments(
+            (comment.pk, comment.post_id, comment.text)
+            for comment in comments
+        )
@@ -0,0 +1,154 @@
+"""Приём картинок постов с ограниченным расходом памяти.
+
+Загружаемый файл проверяется по мере поступления: обработчик загрузки
+перестаёт принимать данные, как только файл превысил
+POST_IMAGE_MAX_BYTES, а размер картинки в пикселях читается из
+заголовка, без декодирования. Лимит пикселей для PNG и WebP меньше,
+чем для JPEG: их нельзя декодировать сразу уменьшенными. Оригинал
+приводится к допустимому размеру и очищается от EXIF позже, в фоновой
+задаче (см. posts.thumbnails).
+"""
+from io import BytesIO
+
+from django import forms
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageFile, ImageOps
+
+HEADER_CHUNK_SIZE = 16 * 1024
+NORMALIZED_FORMATS = ('JPEG', 'PNG', 'WEBP')
+# Форматы, которые Pillow умеет декодировать в уменьшенном масштабе.
+DRAFT_FORMATS = ('JPEG',)
+
+
+class OversizedUpload(UploadedFile):
+    """Файл, приём которого прекращён: хранит только его размер.
+
+    Данных у него нет, и чтение сообщает об ошибке размера: её и выводит
+    ImageField формы, не передавая файл Pillow.
+    """
+
+    def __init__(self, name, content_type, size, charset):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+    def read(self, *args, **kwargs):
+        raise too_large_error()
+
+
+class BoundedUploadHandler(FileUploadHandler):
+    """Не передаёт дальше данные файла, превысившего лимит.
+
+    Стоит первым в FILE_UPLOAD_HANDLERS, так что лишние данные не
+    попадают ни в память, ни во временный файл.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_BYTES:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received > settings.POST_IMAGE_MAX_BYTES:
+            return OversizedUpload(
+                self.file_name, self.content_type, self.received,
+                self.charset,
+            )
+        return None
+
+
+def read_image_header(upload):
+    """Формат и размер картинки по заголовку, прочитанному по частям."""
+    parser = ImageFile.Parser()
+    upload.seek(0)
+    try:
+        for chunk in upload.chunks(HEADER_CHUNK_SIZE):
+            parser.feed(chunk)
+            if parser.image is not None:
+                return parser.image.format, parser.image.size
+    except Exception:
+        return None
+    finally:
+        upload.seek(0)
+    return None
+
+
+def max_pixels(image_format):
+    """Сколько пикселей может быть в картинке этого формата."""
+    if image_format in DRAFT_FORMATS:
+        return settings.POST_IMAGE_MAX_PIXELS
+    return min(
+        settings.POST_IMAGE_MAX_PIXELS, settings.POST_IMAGE_MAX_DECODED_PIXELS
+    )
+
+
+def too_large_error():
+    return forms.ValidationError(
+        'Файл больше %(size)s.',
+        code='file_too_large',
+        params={'size': filesizeformat(settings.POST_IMAGE_MAX_BYTES)},
+    )
+
+
+def validate_upload(upload):
+    """Проверяет размер файла и картинки до её декодирования.
+
+    ImageField к этому времени только открыл файл и проверил его
+    структуру (verify), пиксели не декодировались.
+    """
+    if upload.size > settings.POST_IMAGE_MAX_BYTES:
+        raise too_large_error()
+    header = read_image_header(upload)
+    if header is None:
+        raise forms.ValidationError(
+            'Загрузите правильное изображение.', code='invalid_image'
+        )
+    image_format, (width, height) = header
+    limit = max_pixels(image_format)
+    if width * height > limit:
+        raise forms.ValidationError(
+            'Картинка больше %(pixels)s пикселей.',
+            code='too_many_pixels',
+            params={'pixels': limit},
+        )
+
+
+def normalize_original(storage, name):
+    """Уменьшает слишком большой оригинал и убирает из него EXIF.
+
+    Возвращает True, если файл перезаписан. JPEG декодируется сразу в
+    уменьшенном масштабе (draft), так что память не зависит от размера
+    оригинала; остальные форматы декодируются целиком, и картинку больше
+    их лимита пикселей (она могла попасть в хранилище не через форму)
+    задача не открывает, а сообщает об ошибке.
+    """
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    with storage.open(name) as source:
+        image = Image.open(source)
+        if image.format not in NORMALIZED_FORMATS:
+            return False
+        width, height = image.size
+        if width * height > max_pixels(image.format):
+            raise ValueError(
+                f'{name}: больше {max_pixels(image.format)} пикселей'
+            )
+        oversized = max(image.size) > max_side
+        if not oversized and 'exif' not in image.info:
+            return False
+        image_format = image.format
+        image.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        image.info.pop('exif', None)
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=90)
+    storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+    return True
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db.models.functions import Substr
+
+from .models import Comment
+from .paginator import CursorPaginator
+
+# Поля, которые выводят шаблоны лент.
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'image',
+    'image_manifest',
+    'version',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__title',
+    'group__slug',
+)
+# Сколько символов текста нужно для превью (truncatechars:50).
+PREVIEW_LENGTH = 51
+# Поля и ключ курсора комментариев.
+COMMENT_FIELDS = ('text', 'created', 'author__username')
+COMMENT_KEYS = ('created', 'id')
+
+
+def feed_posts(post_list, preview=False):
+    """Посты ленты вместе с автором и группой одним запросом.
+
+    С preview=True полный текст не читается: вместо него в text_preview
+    попадает начало поста, которого хватает для обрезанного вывода.
+    """
+    post_list = post_list.select_related('author', 'group').only(
+        *FEED_FIELDS
+    )
+    if preview:
+        post_list = post_list.defer('text').annotate(
+            text_preview=Substr('text', 1, PREVIEW_LENGTH)
+        )
+    return post_list
+
+
+def get_page(request, post_list, keys=('pub_date', 'id')):
+    """Страница ленты по курсору (?after=, ?before=) или по номеру (?page=N).
+
+    Номерная пагинация оставлена для совместимости со старыми ссылками.
+    """
+    paginator = CursorPaginator(post_list, settings.POSTS_PER_PAGE, keys)
+    if 'page' in request.GET:
+        return paginator.get_page(request.GET.get('page'))
+    return paginator.get_cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+
+
+def get_comments_page(post_id, after=None):
+    """Страница комментариев поста по курсору, новые первыми."""
+    comments = Comment.objects.filter(post=post_id).select_related(
+        'author'
+    ).only(*COMMENT_FIELDS)
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PER_PAGE, COMMENT_KEYS
+    )
+    return paginator.get_cursor_page(after=after)
@@ -0,0 +1,92 @@
+"""Адаптивные варианты картинок постов.
+
+Для картинки поста создаются кадры с пропорциями миниатюры нескольких
+ширин в современных форматах (WebP и, если Pillow умеет, AVIF). Они
+лежат рядом с оригиналом в MEDIA_ROOT/posts/, а браузер выбирает
+подходящий по srcset, так что телефоны не скачивают картинку шириной
+для настольного экрана.
+
+В имени варианта — хэш содержимого оригинала: у картинок с одинаковым
+именем без расширения (foo.jpg и foo.png, повторная загрузка под
+старым именем) варианты разные.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+WIDTHS = (480, 960, 1440)
+ASPECT = 339 / 960
+QUALITY = 80
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+}
+
+
+def formats():
+    """Форматы вариантов, лучшие сжатием первыми."""
+    Image.init()
+    return [name for name in ('AVIF', 'WEBP') if name in Image.SAVE]
+
+
+def source_digest(name):
+    """Начало SHA-256 содержимого оригинала."""
+    digest = hashlib.sha256()
+    with default_storage.open(name) as source:
+        for chunk in source.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def variant_name(name, digest, width, image_format):
+    stem = os.path.splitext(name)[0]
+    return f'{stem}_{digest}_{width}w.{image_format.lower()}'
+
+
+def variant_names(name, digest, image_format):
+    return {
+        width: variant_name(name, digest, width, image_format)
+        for width in WIDTHS
+    }
+
+
+def make_variants(name):
+    """Создаёт недостающие варианты; True, если создан хоть один."""
+    digest = source_digest(name)
+    missing = [
+        (width, image_format, variant_name(name, digest, width, image_format))
+        for image_format in formats()
+        for width in WIDTHS
+    ]
+    missing = [
+        variant for variant in missing
+        if not default_storage.exists(variant[2])
+    ]
+    if not missing:
+        return False
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for width, image_format, variant in missing:
+            size = (width, round(width * ASPECT))
+            frame = ImageOps.fit(image, size, Image.LANCZOS)
+            buffer = BytesIO()
+            frame.save(buffer, image_format, quality=QUALITY)
+            default_storage.save(variant, ContentFile(buffer.getvalue()))
+    return True
+
+
+def ready_sources(name):
+    """Готовые варианты картинки: [(mime-тип, [(ширина, имя), ...])]."""
+    digest = source_digest(name)
+    sources = []
+    for image_format in formats():
+        names = variant_names(name, digest, image_format)
+        # Самый широкий вариант создаётся последним.
+        if default_storage.exists(names[WIDTHS[-1]]):
+            sources.append((MIME_TYPES[image_format], sorted(names.items())))
+    return sources
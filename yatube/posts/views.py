@@ -1,9 +1,20 @@
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+
+from .cache import (ALL, CARDS, author_scope, get_generation, group_scope,
+                    post_scope)
+from .conditional import (group_etag, index_etag, page_cache_control,
+                          post_etag, profile_etag)
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .middleware import cache_page_for_guests
+from .models import Follow, Group, Post, User
+from .search import SearchPaginator, search_posts
+from .timeline import FEED_KEYS, follow_feed
+from .utils import feed_posts, get_comments_page, get_page
 
 
 def authorized_only(func):
@@ -14,83 +25,146 @@ def authorized_only(func):
     return check_user
 
 
+@page_cache_control(max_age=30)
+@condition(etag_func=index_etag)
 def index(request):
-    posts = Post.objects.all()[:settings.POSTS_PER_PAGE]
-
+    cache_page_for_guests(request, ALL)
     post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.POSTS_PER_PAGE)
 
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
 
-    page_number = request.GET.get('page')
-
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_page(request, feed_posts(post_list))
+    # posts и page_obj указывают на одни и те же уже прочитанные строки
     context = {
         'title': title,
-        'posts': posts,
-        'page_obj': page_obj
+        'posts': page_obj.object_list,
+        'page_obj': page_obj,
+        # Имена авторов в карточках фрагмента сбрасывают CARDS.
+        'feed_version': get_generation(CARDS, ALL),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
     }
     return render(request, template, context)
 
 
+@page_cache_control(max_age=60)
+@condition(etag_func=group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.group.all()[:settings.POSTS_PER_PAGE]
+    cache_page_for_guests(request, group_scope(group.pk))
     template = 'posts/group_list.html'
     title = f'Записи сообщества {group}'
     post_list = group.group.all()
-    paginator = Paginator(post_list, settings.POSTS_PER_PAGE)
 
-    page_number = request.GET.get('page')
-
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_page(request, feed_posts(post_list))
     context = {
         'slug': slug,
         'group': group,
-        'posts': posts,
+        'posts': page_obj.object_list,
         'title': title,
         'page_obj': page_obj,
+        'feed_version': get_generation(CARDS, group_scope(group.pk)),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
     }
     return render(request, template, context)
 
 
+@page_cache_control(max_age=60)
+@condition(etag_func=profile_etag)
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('counters'), username=username
+    )
+    cache_page_for_guests(request, author_scope(author.pk))
     post_list = Post.objects.filter(author=author)
-    paginator = Paginator(post_list, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    user = request.user.is_authenticated
-    following = Follow.objects.filter(author__following__user=user)
+    page_obj = get_page(request, feed_posts(post_list, preview=True))
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     context = {
         'author': author,
         'page_obj': page_obj,
         'post_list': post_list,
         'following': following,
+        'feed_version': get_generation(CARDS, author_scope(author.pk)),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
     }
     return render(request, template, context)
 
 
+@page_cache_control(max_age=30)
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__counters', 'group'),
+        pk=post_id
+    )
+    cache_page_for_guests(
+        request, post_scope(post.pk), author_scope(post.author_id)
+    )
     form = CommentForm()
-    comment = Comment.objects.filter(post=post_id)
+    comments_page = get_comments_page(
+        post_id, request.GET.get('comments_after')
+    )
     context = {
         'post': post,
         'form': form,
-        'comment': comment,
+        'comment': comments_page.object_list,
+        'comments_page': comments_page,
     }
     return render(request, template, context)
 
 
+@page_cache_control(max_age=30)
+def search(request):
+    """Посты и комментарии по запросу ?q=, самые подходящие первыми."""
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(
+        feed_posts(search_posts(query)), settings.POSTS_PER_PAGE
+    )
+    page_obj = paginator.get_cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        # Ссылки пагинатора сохраняют запрос.
+        'query_string': urlencode({'q': query}),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def post_comments(request, post_id):
+    """Следующая страница комментариев поста в JSON для подгрузки."""
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    comments_page = get_comments_page(post_id, request.GET.get('after'))
+    comments = [
+        {
+            'id': comment.pk,
+            'author': comment.author.username,
+            'author_url': reverse(
+                'posts:profile', args=(comment.author.username,)
+            ),
+            'text': comment.text,
+            'created': comment.created.isoformat(),
+        }
+        for comment in comments_page
+    ]
+    return JsonResponse({
+        'comments': comments,
+        'next': comments_page.cursor.next_cursor,
+    })
+
+
 @authorized_only
 def post_create(request):
     template = 'posts/create_post.html'
     groups = Group.objects.all()
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
 
     if form.is_valid():
         post = form.save(commit=False)
@@ -99,8 +173,6 @@ def post_create(request):
         return redirect(
             'posts:profile', username=request.user.username,
         )
-    else:
-        form = PostForm(files=request.FILES or None)
     context = {
         'form': form,
         'groups': groups,
@@ -149,11 +221,9 @@ def follow_index(request):
     # информация о текущем пользователе доступна в переменной request.user
     template = 'posts/follow.html'
 
-    all_posts = Post.objects.filter(author__following__user=request.user)
+    all_posts = follow_feed(request.user)
 
-    paginator = Paginator(all_posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_page(request, feed_posts(all_posts), FEED_KEYS)
     context = {
         'page_obj': page_obj
     }
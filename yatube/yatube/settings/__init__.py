@@ -0,0 +1,20 @@
+"""Настройки проекта по профилям.
+
+Профиль выбирается переменной окружения SETTINGS_PROFILE (или
+.env): development — для разработки, с DEBUG и debug_toolbar;
+production — для сервера, без отладочных приложений.
+"""
+from decouple import config
+
+SETTINGS_PROFILE = config('SETTINGS_PROFILE', default='development')
+
+if SETTINGS_PROFILE == 'production':
+    from .production import *
+elif SETTINGS_PROFILE == 'development':
+    from .development import *
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек: {SETTINGS_PROFILE}'
+    )
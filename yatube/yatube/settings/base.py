@@ -0,0 +1,270 @@
+import os
+from decouple import Csv, config
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = config("SECRET_KEY")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# Включается профилем development.
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.andr3wk.pythonanywhere.com',
+    'andr3wk.pythonanywhere.com',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# sqlite — файл рядом с проектом; postgres — сервер PostgreSQL 11+
+# (требует пакет psycopg2), на нём миграции добавляют частичный и
+# покрывающий индексы.
+DATABASE_BACKEND = config('DATABASE_BACKEND', default='sqlite')
+DATABASE_BACKENDS = {
+    'sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_NAME', default='yatube'),
+        'USER': config('DB_USER', default='yatube'),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default='127.0.0.1'),
+        'PORT': config('DB_PORT', default=5432, cast=int),
+    },
+}
+DATABASES = {
+    'default': DATABASE_BACKENDS[DATABASE_BACKEND],
+}
+# Реплики только для чтения (см. core.routers): через запятую файлы
+# SQLite или хосты PostgreSQL, алиасы replica1, replica2...
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+REPLICA_KEY = 'NAME' if DATABASE_BACKEND == 'sqlite' else 'HOST'
+DATABASES.update({
+    f'replica{number}': {
+        **DATABASES['default'],
+        REPLICA_KEY: location,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for number, location in enumerate(DATABASE_REPLICAS, 1)
+})
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Сколько секунд после записи пользователь читает из default; столько
+# же после изменения ленты её читают из default при заполнении кэша.
+REPLICA_PIN_SECONDS = 10
+# Настройка SQLite для нескольких воркеров (см. core.signals): WAL,
+# ожидание блокировки вместо ошибки и больший кэш страниц.
+SQLITE_TUNING = config('SQLITE_TUNING', default=False, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в килобайтах.
+    'cache_size': -64 * 1024,
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+POSTS_PER_PAGE = 10
+# Комментарии под постом выводятся страницами, остальные подгружаются.
+COMMENTS_PER_PAGE = 20
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Кэш: locmem — свой у каждого процесса, file и redis — общий для всех
+# воркеров (redis требует пакет django-redis).
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config(
+            'CACHE_LOCATION', default=os.path.join(BASE_DIR, 'cache')
+        ),
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config(
+            'CACHE_LOCATION', default='redis://127.0.0.1:6379/1'
+        ),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+# Маленький LRU-кэш процесса перед общим кэшем для самых горячих ключей.
+if config('CACHE_LOCAL_TIER', default=False, cast=bool):
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TwoTierCache',
+            'OPTIONS': {
+                'SHARED_ALIAS': 'shared',
+                'LOCAL_TIMEOUT': config(
+                    'CACHE_LOCAL_TIMEOUT', default=5, cast=int
+                ),
+                'LOCAL_MAX_ENTRIES': 1000,
+                # Поколения лент и метки их изменений должны совпадать
+                # во всех процессах
+                'LOCAL_EXCLUDE_PREFIXES': (
+                    'feed-generation:', 'feed-bumped:',
+                ),
+            },
+        },
+        'shared': CACHE_BACKENDS[CACHE_BACKEND],
+    }
+
+# Лента подписок: авторов с большим числом подписчиков не раскладываем
+# по лентам при публикации, а подмешиваем при чтении. При подписке в
+# ленту попадают только TIMELINE_BACKFILL_SIZE последних постов автора.
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_SIZE = 1000
+# Потоки, раскладывающие посты автора, который перестал быть «тяжёлым»;
+# 0 — раскладывать сразу при отписке.
+TIMELINE_WORKERS = config('TIMELINE_WORKERS', default=1, cast=int)
+
+# Фрагменты лент сбрасываются сигналами, так что их можно хранить долго.
+FEED_CACHE_TIMEOUT = 60 * 60 * 4
+# Целые страницы для гостей, сбрасываются теми же поколениями лент.
+PAGE_CACHE_TIMEOUT = 60 * 60 * 4
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Миниатюры картинок создаются в пуле потоков после сохранения поста;
+# 0 — создавать сразу при сохранении.
+THUMBNAIL_WORKERS = config('THUMBNAIL_WORKERS', default=2, cast=int)
+
+# Загрузка картинок: файл больше лимита перестаёт приниматься сразу,
+# размер в пикселях проверяется по заголовку, а оригинал больше
+# POST_IMAGE_MAX_SIDE уменьшается в фоне.
+POST_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+# PNG и WebP, в отличие от JPEG, не декодируются в уменьшенном масштабе,
+# и фоновая задача держит в памяти всю картинку: до 48 МБ при этом
+# лимите.
+POST_IMAGE_MAX_DECODED_PIXELS = 12_000_000
+POST_IMAGE_MAX_SIDE = 2560
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.BoundedUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
@@ -0,0 +1,18 @@
+from .base import *
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + [
+    'debug_toolbar',
+]
+
+MIDDLEWARE = MIDDLEWARE + [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+INTERNAL_IPS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
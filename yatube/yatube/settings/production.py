@@ -0,0 +1,36 @@
+from .base import *
+
+DEBUG = False
+
+# Шаблоны читаются и компилируются один раз на процесс.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Соединение с базой живёт между запросами, а не открывается на каждый.
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=60, cast=int)
+DATABASES = {
+    alias: {**database, 'CONN_MAX_AGE': CONN_MAX_AGE}
+    for alias, database in DATABASES.items()
+}
+
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+
+# Имена статики с хэшем содержимого можно кэшировать навсегда;
+# перед запуском нужен collectstatic.
+STATIC_ROOT = config(
+    'STATIC_ROOT', default=os.path.join(BASE_DIR, 'staticfiles')
+)
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)